@@ -1,15 +1,29 @@
+import os
 import pytest
 from pathlib import Path
 import getpass
 import warnings
 
-from xaux.fs import afs_accessible, eos_accessible
+from xaux import ranID
+from xaux.fs import FsPath, afs_accessible, eos_accessible
 
 
 def pytest_addoption(parser):
     parser.addoption(
         "--user", action="store", default="sixtadm", help="Specify the user that has access to EOS and AFS."
     )
+    parser.addoption(
+        "--runslow", action="store_true", default=False, help="Also run the tests marked as slow, and use the long waits in the others."
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="Slow test; use --runslow to run it.")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
 
 
 @pytest.fixture(scope="session")
@@ -50,3 +64,25 @@ def test_user(request):
                             + "user account with the option `--user username`\nI Tried the following paths:\n    "
                             + "\n    ".join(eos_paths_tried) + "\nThe relevant EosPath tests will be skipped.")
     return {"test_user": test_user, "afs_path": afs_path, "skip_afs": skip_afs, "eos_path": eos_path, "skip_eos": skip_eos}
+
+
+# Built once, as every EOS path instantiation needs a few probes on the file system
+@pytest.fixture(scope="session")
+def eos_test_dir(test_user):
+    if test_user['skip_eos']:
+        pytest.skip("EOS test directory is not accessible.")
+    return FsPath(test_user['eos_path'])
+
+# A scratch directory per session and per pytest-xdist worker, such that concurrent
+# test runs (also from different machines) do not collide on EOS
+@pytest.fixture(scope="session")
+def eos_scratch(eos_test_dir):
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    scratch = eos_test_dir / f"scratch_{worker}_{ranID(only_alphanumeric=True)}"
+    scratch.mkdir()
+    yield scratch
+    scratch.rmtree()
+
+@pytest.fixture(scope="session")
+def eos_scratch_resolved(eos_scratch):
+    return eos_scratch.resolve()
@@ -3,16 +3,23 @@
 # Copyright (c) CERN, 2025.                 #
 # ######################################### #
 
+import sys
 from time import sleep
 from xaux import system_lock, FsPath
 
-system_lock(FsPath.cwd() / 'test_cronjob.lock')
 
-print("Cronjob running.")
+def run_cronjob(duration=5):
+    system_lock(FsPath.cwd() / 'test_cronjob.lock')
 
-file = FsPath.cwd() / 'test_cronjob.txt'
-file.touch()
-sleep(5)
-file.unlink()
+    print("Cronjob running.", flush=True)
 
-print("Cronjob finished.")
+    file = FsPath.cwd() / 'test_cronjob.txt'
+    file.touch()
+    sleep(duration)
+    file.unlink()
+
+    print("Cronjob finished.")
+
+
+if __name__ == '__main__':
+    run_cronjob(*[float(arg) for arg in sys.argv[1:2]])
@@ -5,12 +5,27 @@
 
 from pathlib import Path
 import os
+import re
 import pytest
 
 from xaux.fs import *
 from xaux.fs.afs import _fs_installed
 
 
+# Platform-dependent classes, used in the instantiation tests of all file systems
+_is_nt = os.name == 'nt'
+LocalSystemPath    = LocalWindowsPath if _is_nt else LocalPosixPath
+LocalNonSystemPath = LocalPosixPath   if _is_nt else LocalWindowsPath
+AfsSystemPath      = AfsWindowsPath   if _is_nt else AfsPosixPath
+AfsNonSystemPath   = AfsPosixPath     if _is_nt else AfsWindowsPath
+EosSystemPath      = EosWindowsPath   if _is_nt else EosPosixPath
+EosNonSystemPath   = EosPosixPath     if _is_nt else EosWindowsPath
+
+# Evaluated once, as it is needed in the skip conditions of many tests (the AFS and EOS
+# availability flags are already computed once, at import of xaux.fs)
+_cwd_is_local = isinstance(FsPath.cwd(), LocalPath)
+
+
 def _test_user(test_user):
     if test_user['skip_afs']:
         pytest.skip("AFS test directory is not accessible.")
@@ -27,7 +42,7 @@ def _eos_test_path(test_user, skip=True):
     return test_user['eos_path']
 
 
-@pytest.mark.skipif(not isinstance(FsPath.cwd(), LocalPath), reason="This test should be ran from a local path.")
+@pytest.mark.skipif(not _cwd_is_local, reason="This test should be ran from a local path.")
 def test_touch_and_symlinks_local():
     file = "example_file.txt"
     link = "example_link.txt"
@@ -36,8 +51,7 @@ def test_touch_and_symlinks_local():
     path_link = Path(link)
     path_broken_link = Path(broken_link)
     for path in [path_file, path_link, path_broken_link]:
-        if path.exists():
-            path.unlink()
+        path.unlink(missing_ok=True)
     # Assert correct file creation with standard pathlib API
     path_file.touch(exist_ok=False)
     path_link.symlink_to(path_file)
@@ -99,98 +113,92 @@ def test_touch_and_symlinks_local():
     path_file.unlink()
     path_link.unlink()
     path_broken_link.unlink()
-
-
-def _test_instantiation(file, PathClass, SystemPathClass, NonSystemPathClass, this_path):
-    for path in [file, (Path.cwd() / file).as_posix(), Path(file), Path(file).resolve()]:
-        for cls in [FsPath, PathClass, SystemPathClass]:
+    # Deleting non-existing files
+    with pytest.raises(FileNotFoundError):
+        path_file.unlink()
+    path_file.unlink(missing_ok=True)
+    path_broken_link.unlink(missing_ok=True)
+
+
+def _test_instantiation(file, PathClass, SystemPathClass, NonSystemPathClass, this_path, *,
+                        path_forms=None):
+    if path_forms is None:
+        path_forms = [file, (Path.cwd() / file).as_posix(), Path(file), Path(file).resolve()]
+    # The system class derives from all others, so checking it is sufficient
+    for inst in [Path, FsPath, PathClass]:
+        assert issubclass(SystemPathClass, inst)
+    classes = [FsPath, PathClass, SystemPathClass]
+    err_pattern = re.compile(f"Cannot instantiate '{NonSystemPathClass.__name__}' on your system")
+    for path in path_forms:
+        for cls in classes:
             # Testing all initialisations
             new_path = cls(path)
-            assert new_path.resolve() == this_path
-            # Testing all mixed initialisations
-            for cls2 in [FsPath, PathClass, SystemPathClass]:
-                new_path = cls2(cls(path))
-                assert new_path.resolve() == this_path
-            # Verifying that the correct class is returned
-            for inst in [Path, FsPath, PathClass, SystemPathClass]:
-                assert isinstance(new_path, inst)
-            assert not isinstance(new_path, NonSystemPathClass)
-        with pytest.raises(OSError, match=f"Cannot instantiate " +
-                           f"'{NonSystemPathClass.__name__}' on your system"):
+            # Testing all mixed initialisations (re-using the first construction)
+            for this_new_path in [new_path, *[cls2(new_path) for cls2 in classes]]:
+                assert this_new_path.resolve() == this_path
+                # Verifying that the correct class is returned
+                assert isinstance(this_new_path, SystemPathClass)
+                assert not isinstance(this_new_path, NonSystemPathClass)
+        with pytest.raises(OSError, match=err_pattern):
             new_path = NonSystemPathClass(path)
 
 
-@pytest.mark.skipif(not isinstance(FsPath.cwd(), LocalPath), reason="This test should be ran from a local path.")
-def test_instantiation_local():
-    LocalSystemPath    = LocalWindowsPath if os.name == 'nt' else LocalPosixPath
-    LocalNonSystemPath = LocalPosixPath   if os.name == 'nt' else LocalWindowsPath
+# Each case gets its own directory, such that the cases are independent (and can be
+# distributed over workers with pytest-xdist)
+@pytest.mark.skipif(not _cwd_is_local, reason="This test should be ran from a local path.")
+@pytest.mark.parametrize("case", ["non-existent", "existent", "relative link", "absolute link"])
+def test_instantiation_local(case, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     file = "example_local_file.txt"
     rel_link = "example_local_relative_link.txt"
     abs_link = "example_local_absolute_link.txt"
-    for f in [file, rel_link, abs_link]:
-        if FsPath(f).lexists():
-            FsPath(f).unlink()
     this_path = LocalSystemPath(file).resolve()
-    # Test with non-existing file
-    print(f"Testing LocalPath with {file} (non-existent)...")
-    _test_instantiation(file, LocalPath, LocalSystemPath, LocalNonSystemPath, this_path)
-    # Test with existing file
-    FsPath(file).touch()
-    print(f"Testing LocalPath with {file} (existent)...")
-    _test_instantiation(file, LocalPath, LocalSystemPath, LocalNonSystemPath, this_path)
-    # Test with relative link
-    print(f"Testing LocalPath with {rel_link} (relative link)...")
-    FsPath(rel_link).symlink_to(Path(file))
-    _test_instantiation(rel_link, LocalPath, LocalSystemPath, LocalNonSystemPath, this_path)
-    # Test with absolute link
-    print(f"Testing LocalPath with {abs_link} (absolute link)...")
-    FsPath(abs_link).symlink_to(Path(file).resolve())
-    _test_instantiation(abs_link, LocalPath, LocalSystemPath, LocalNonSystemPath, this_path)
-    # Clean-up
-    for f in [file, rel_link, abs_link]:
-        FsPath(f).unlink()
+    if case != "non-existent":
+        FsPath(file).touch()
+    if case == "relative link":
+        FsPath(rel_link).symlink_to(Path(file))
+        file = rel_link
+    elif case == "absolute link":
+        FsPath(abs_link).symlink_to(Path(this_path))
+        file = abs_link
+    # The resolved form is this_path itself, so no need to resolve again
+    path_forms = [file, (Path.cwd() / file).as_posix(), Path(file), Path(this_path)]
+    print(f"Testing LocalPath with {file} ({case})...")
+    _test_instantiation(file, LocalPath, LocalSystemPath, LocalNonSystemPath, this_path,
+                        path_forms=path_forms)
+
+
+def _ensure_symlink(link, res):
+    res.mkdir(exist_ok=True)
+    # EAFP: only remove a stale link when it is actually in the way
+    try:
+        link.symlink_to(res)
+    except FileExistsError:
+        link.unlink()
+        link.symlink_to(res)
 
 
 @pytest.mark.skipif(not afs_accessible, reason="AFS is not accessible.")
 @pytest.mark.skipif(not eos_accessible, reason="EOS is not accessible.")
-@pytest.mark.skipif(not isinstance(FsPath.cwd(), LocalPath), reason="This test should be ran from a local path.")
+@pytest.mark.skipif(not _cwd_is_local, reason="This test should be ran from a local path.")
 def test_nested_fs(test_user):
     level1     = FsPath(_afs_test_path(test_user)) / "level1"
     level1_res = FsPath.cwd() / "level1"
-    level1_res.mkdir(exist_ok=True)
-    if level1.lexists():
-        level1.unlink()
-    level1.symlink_to(level1_res)
     level2     = level1_res / "level2"
     level2_res = FsPath(_eos_test_path(test_user)) / "level2_res"
-    level2_res.mkdir(exist_ok=True)
-    if level2.lexists():
-        level2.unlink()
-    level2.symlink_to(level2_res)
     level3     = level2_res / "level3"
     level3_res = FsPath(_afs_test_path(test_user)) / "level3_res"
-    level3_res.mkdir(exist_ok=True)
-    if level3.lexists():
-        level3.unlink()
-    level3.symlink_to(level3_res)
     level4     = level3_res / "level4"
     level4_res = FsPath(_eos_test_path(test_user)) / "level4_res"
-    level4_res.mkdir(exist_ok=True)
-    if level4.lexists():
-        level4.unlink()
-    level4.symlink_to(level4_res)
     level5     = level4_res / "level5"
     level5_res = FsPath.cwd() / "level5_res"
-    level5_res.mkdir(exist_ok=True)
-    if level5.lexists():
-        level5.unlink()
-    level5.symlink_to(level5_res)
     level6     = level5_res / "level6"
     level6_res = FsPath(_afs_test_path(test_user)) / "level6_res"
-    level6_res.mkdir(exist_ok=True)
-    if level6.lexists():
-        level6.unlink()
-    level6.symlink_to(level6_res)
+    # Each link lives inside the previous target, so the plan is executed in order.
+    plan = [(level1, level1_res), (level2, level2_res), (level3, level3_res),
+            (level4, level4_res), (level5, level5_res), (level6, level6_res)]
+    for link, res in plan:
+        _ensure_symlink(link, res)
 
     for l in [level1, level2, level3, level4, level5, level6]:
         assert l.lexists()
@@ -223,24 +231,16 @@ def test_nested_fs(test_user):
     expected = [EosPath, AfsPath, EosPath, LocalPath, AfsPath,
                 AfsPath, AfsPath, AfsPath, AfsPath, AfsPath,
                 AfsPath, LocalPath, LocalPath]
-    assert all([isinstance(f, exp) for f, exp in zip(parents, expected)])
+    assert all(isinstance(f, exp) for f, exp in zip(parents, expected))
     assert isinstance(path.resolve(), AfsPath)
     parents_res = [f.resolve() for f in path.parents]
     assert len(parents_res) == 13
     expected_res = [LocalPath, EosPath, AfsPath, EosPath, LocalPath,
                     AfsPath, AfsPath, AfsPath, AfsPath, AfsPath,
                     AfsPath, LocalPath, LocalPath]
-    assert all([isinstance(f, exp) for f, exp in zip(parents_res, expected_res)])
-
-    level1.unlink()
-    level2.unlink()
-    level3.unlink()
-    level4.unlink()
-    level5.unlink()
-    level6.unlink()
-    level1_res.rmdir()
-    level2_res.rmdir()
-    level3_res.rmdir()
-    level4_res.rmdir()
-    level5_res.rmdir()
-    level6_res.rmdir()
+    assert all(isinstance(f, exp) for f, exp in zip(parents_res, expected_res))
+
+    for link, _ in plan:
+        link.unlink()
+    for _, res in plan:
+        res.rmdir()
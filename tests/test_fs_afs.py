@@ -10,19 +10,17 @@ import pytest
 from xaux.fs import *
 from xaux.fs.afs import _fs_installed
 
-from test_fs import _test_instantiation, _afs_test_path, _eos_test_path, _test_user
+from test_fs import _test_instantiation, _afs_test_path, _eos_test_path, _test_user, _cwd_is_local, \
+                    AfsSystemPath, AfsNonSystemPath, LocalSystemPath, LocalNonSystemPath
 
 
 @pytest.mark.skipif(afs_accessible, reason="AFS is accessible.")
 def test_touch_and_symlinks_afs_no_access(test_user):
-    afs_path = _afs_test_path(test_user, skip=False)
-    file = (Path(afs_path) / "example_file.txt").as_posix()
-    link = (Path(afs_path) / "example_link.txt").as_posix()
-    broken_link = (Path(afs_path) / "example_broken_link.txt").as_posix()
+    afs_path = FsPath(_afs_test_path(test_user, skip=False))
     # Create and test with FsPath
-    path_file = FsPath(file)
-    path_link = FsPath(link)
-    path_broken_link = FsPath(broken_link)
+    path_file = afs_path / "example_file.txt"
+    path_link = afs_path / "example_link.txt"
+    path_broken_link = afs_path / "example_broken_link.txt"
     assert isinstance(path_file, AfsPath)
     assert isinstance(path_link, AfsPath)
     assert isinstance(path_broken_link, AfsPath)
@@ -31,29 +29,26 @@ def test_touch_and_symlinks_afs_no_access(test_user):
     with pytest.raises(OSError, match="AFS is not installed on your system."):
         path_link.symlink_to(path_file)
     with pytest.raises(OSError, match="AFS is not installed on your system."):
-        path_broken_link.symlink_to(f"{file}_nonexistent")
+        path_broken_link.symlink_to(f"{path_file}_nonexistent")
 
 
 @pytest.mark.skipif(not afs_accessible, reason="AFS is not accessible.")
 def test_touch_and_symlinks_afs_access(test_user):
-    file = (Path(_afs_test_path(test_user)) / "example_file.txt").as_posix()
-    link = (Path(_afs_test_path(test_user)) / "example_link.txt").as_posix()
-    broken_link = (Path(_afs_test_path(test_user)) / "example_broken_link.txt").as_posix()
+    afs_path = FsPath(_afs_test_path(test_user))
     # Create and test with FsPath
-    path_file = FsPath(file)
-    path_link = FsPath(link)
-    path_broken_link = FsPath(broken_link)
+    path_file = afs_path / "example_file.txt"
+    path_link = afs_path / "example_link.txt"
+    path_broken_link = afs_path / "example_broken_link.txt"
     assert isinstance(path_file, AfsPath)
     assert isinstance(path_link, AfsPath)
     assert isinstance(path_broken_link, AfsPath)
     for path in [path_file, path_link, path_broken_link]:
-        if path.lexists():
-            path.unlink()
+        path.unlink(missing_ok=True)
         assert not path.exists()
         assert not path.lexists()
     path_file.touch(exist_ok=False)
     path_link.symlink_to(path_file)
-    path_broken_link.symlink_to(f"{file}_nonexistent")
+    path_broken_link.symlink_to(f"{path_file}_nonexistent")
     assert path_file.exists()
     assert path_link.exists()
     assert path_link.lexists()
@@ -64,24 +59,22 @@ def test_touch_and_symlinks_afs_access(test_user):
     assert path_broken_link.is_symlink()
     assert path_broken_link.is_broken_symlink()
     # Double-check existence with pathlib API
-    assert Path(file).exists()
-    assert Path(link).exists()
-    assert Path(link).is_symlink()
-    assert not Path(broken_link).exists()
-    assert Path(broken_link).is_symlink()
+    assert Path(path_file).exists()
+    assert Path(path_link).exists()
+    assert Path(path_link).is_symlink()
+    assert not Path(path_broken_link).exists()
+    assert Path(path_broken_link).is_symlink()
     # Delete with FsPath
     path_file.unlink()
     path_link.unlink()
     path_broken_link.unlink()
 
 
-@pytest.mark.skipif(not isinstance(FsPath.cwd(), LocalPath), reason="This test should be ran from a local path.")
+@pytest.mark.skipif(not _cwd_is_local, reason="This test should be ran from a local path.")
 def test_instantiation_afs(test_user):
-    AfsSystemPath    = AfsWindowsPath if os.name == 'nt' else AfsPosixPath
-    AfsNonSystemPath = AfsPosixPath   if os.name == 'nt' else AfsWindowsPath
-    file_abs = (Path(_afs_test_path(test_user, skip=False)) / "example_afs_file.txt").as_posix()
-    if afs_accessible and Path(file_abs).exists():
-        Path(file_abs).unlink()
+    file_abs = os.path.join(_afs_test_path(test_user, skip=False), "example_afs_file.txt")
+    if afs_accessible:
+        Path(file_abs).unlink(missing_ok=True)
     this_path = AfsSystemPath(file_abs)
     # Test non-existing file
     print(f"Testing AfsPath with {file_abs} (non-existent)...")
@@ -94,29 +87,24 @@ def test_instantiation_afs(test_user):
 
 
 @pytest.mark.skipif(not afs_accessible, reason="AFS is not accessible.")
-@pytest.mark.skipif(not isinstance(FsPath.cwd(), LocalPath), reason="This test should be ran from a local path.")
+@pytest.mark.skipif(not _cwd_is_local, reason="This test should be ran from a local path.")
 def test_instantiation_afs_access(test_user):
-    AfsSystemPath    = AfsWindowsPath if os.name == 'nt' else AfsPosixPath
-    AfsNonSystemPath = AfsPosixPath   if os.name == 'nt' else AfsWindowsPath
-    LocalSystemPath    = LocalWindowsPath if os.name == 'nt' else LocalPosixPath
-    LocalNonSystemPath = LocalPosixPath   if os.name == 'nt' else LocalWindowsPath
     _file_rel = "example_afs_file.txt"
     _link_rel = "example_afs_relative_link.txt"
-    file_abs = (Path(_afs_test_path(test_user)) / _file_rel).as_posix()
-    rel_link = (Path(_afs_test_path(test_user)) / _link_rel).as_posix() # on AFS, will point (relative) to _file_rel
+    file_abs = os.path.join(_afs_test_path(test_user), _file_rel)
+    rel_link = os.path.join(_afs_test_path(test_user), _link_rel) # on AFS, will point (relative) to _file_rel
     abs_link = "example_afs_absolute_link.txt"               # on local, will point (absolute) to file_abs
     fs_link = "afs_test"                                     # on local, will point to absolute AFS folder
-    file_fs = (Path(fs_link) / _file_rel).as_posix()         # on local linked folder, equal to file_abs
-    rel_link_fs = (Path(fs_link) / _link_rel).as_posix()     # on local linked folder, will point (relative) to _file_rel
+    file_fs = os.path.join(fs_link, _file_rel)         # on local linked folder, equal to file_abs
+    rel_link_fs = os.path.join(fs_link, _link_rel)     # on local linked folder, will point (relative) to _file_rel
     file_local = "example_file.txt"
-    link_fs_to_local = (Path(fs_link) / "example_afs_link_to_fs.txt").as_posix() # on local linked folder, will point (absolute) to local file
-    abs_link_fs = (Path(fs_link) / "example_afs_double_link.txt").as_posix()     # on local linked folder, will point (absolute) to abs_link
+    link_fs_to_local = os.path.join(fs_link, "example_afs_link_to_fs.txt") # on local linked folder, will point (absolute) to local file
+    abs_link_fs = os.path.join(fs_link, "example_afs_double_link.txt")     # on local linked folder, will point (absolute) to abs_link
 
     # Clean start
     for f in [file_abs, rel_link, abs_link, file_fs, rel_link_fs, \
               file_local, link_fs_to_local, abs_link_fs, fs_link]:   # fs_link should go last..
-        if FsPath(f).lexists():
-            FsPath(f).unlink()
+        FsPath(f).unlink(missing_ok=True)
     this_path = AfsSystemPath(file_abs).resolve()
 
     # Test with existing file
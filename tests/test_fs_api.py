@@ -14,12 +14,16 @@ import xaux.fs  # to set test flags
 
 from test_fs import _afs_test_path, _eos_test_path
 
+def _cleanup_default_files(test_dir):
+    # unlink(missing_ok=True) replaces a separate exists() check per file (on EOS,
+    # unlink still probes for symlinks and directories before removing)
+    for i in range(1, 8):
+        FsPath(test_dir, f"default_file_{i}.txt").unlink(missing_ok=True)
+
 def test_fs_methods():
     all_stat_fields = [k for k in os.stat_result.__dict__ if k.startswith('st_')]
     test_stats = Path('test_fs_api.py').stat()
-    stat_dict = {}
-    for key in all_stat_fields:
-        stat_dict[key] = getattr(test_stats, key)
+    stat_dict = {key: getattr(test_stats, key) for key in all_stat_fields}
     new_stats = make_stat_result(stat_dict)
     print(test_stats)
     print(new_stats)
@@ -45,8 +49,7 @@ def test_fspath_methods(test_user):
     assert isinstance(new_path, EosPath)
     if afs_accessible:
         path_afs_link = FsPath("~/afs_test").expanduser()
-        if path_afs_link.lexists():
-            path_afs_link.unlink()
+        path_afs_link.unlink(missing_ok=True)
         path_afs_link.symlink_to(FsPath(_afs_test_path(test_user)))
         test = FsPath("~/afs_test/default_file.txt").expanduser()
         assert isinstance(test, AfsPath)
@@ -55,8 +58,7 @@ def test_fspath_methods(test_user):
         path_afs_link.unlink()
     if eos_accessible:
         path_eos_link = FsPath("~/eos_test").expanduser()
-        if path_eos_link.lexists():
-            path_eos_link.unlink()
+        path_eos_link.unlink(missing_ok=True)
         path_eos_link.symlink_to(FsPath(_eos_test_path(test_user)))
         test = FsPath("~/eos_test/default_file.txt").expanduser()
         assert isinstance(test, EosPath)
@@ -65,6 +67,67 @@ def test_fspath_methods(test_user):
         path_eos_link.unlink()
 
 
+def test_cp_xrdcp_batching(tmp_path, monkeypatch):
+    # Offline check of the xrdcp command lines: the actual copy is replaced by touching
+    # the targets, except for one file, which should then be returned for a retry.
+    from subprocess import CompletedProcess
+    from xaux.fs.io import _cp_xrdcp
+    for folder in ['src', 'dir1', 'dir2']:
+        (tmp_path / folder).mkdir()
+    src = [FsPath(tmp_path / 'src' / f'file_{i}.txt') for i in range(4)]
+    dir1 = FsPath(tmp_path / 'dir1')
+    dir2 = FsPath(tmp_path / 'dir2')
+    sources_targets = [[src[0], dir1 / 'file_0.txt', False],
+                       [src[1], dir2 / 'renamed.txt', False],
+                       [src[2], dir1 / 'file_2.txt', False],
+                       [src[3], dir1 / 'file_3.txt', False]]
+    failed = dir1 / 'file_3.txt'
+    commands = []
+    def fake_run(cmd, **kwargs):
+        commands.append(cmd)
+        for arg in cmd:
+            if arg.startswith('--'):
+                continue
+            if arg.endswith('/'):
+                for name in ['file_0.txt', 'file_2.txt', 'file_3.txt']:
+                    if FsPath(arg, name) != failed:
+                        FsPath(arg, name).touch()
+            elif arg.startswith(dir2.as_posix()):
+                FsPath(arg).touch()
+        return CompletedProcess(cmd, 0, b'', b'')
+    monkeypatch.setattr(xaux.fs, '_xrdcp_use_ipv4', False)
+    monkeypatch.setattr(xaux.fs.io, 'run', fake_run)
+
+    retry, stdout, stderr = _cp_xrdcp(sources_targets)
+    opts = ['--cksum', 'adler32', '--force', '--nopbar', '--rm-bad-cksum']
+    # The batch is executed at the position of its first file, the renamed file on its own
+    assert commands == [
+        ['xrdcp', '--parallel', '3', *opts, src[0].as_posix(), src[2].as_posix(),
+         src[3].as_posix(), dir1.as_posix() + '/'],
+        ['xrdcp', *opts, src[1].as_posix(), (dir2 / 'renamed.txt').as_posix()]
+    ]
+    assert retry == [[src[3], failed, False]]
+    assert f"Target {failed} does not exist." in stderr
+
+    # A target name does not repeat within a batch, and a batch is not moved past a copy
+    # that touches its directory, such that the last copy of a target still wins
+    (tmp_path / 'src2').mkdir()
+    src_other = FsPath(tmp_path / 'src2' / 'file_0.txt')
+    commands.clear()
+    _cp_xrdcp([[src[0], dir1 / 'file_0.txt', False],
+               [src_other, dir1 / 'file_0.txt', False],
+               [src[2], dir1 / 'file_2.txt', False],
+               [FsPath(tmp_path / 'src'), dir1 / 'sub', True],
+               [src[3], dir1 / 'file_3.txt', False]])
+    assert commands == [
+        ['xrdcp', *opts, src[0].as_posix(), (dir1 / 'file_0.txt').as_posix()],
+        ['xrdcp', '--parallel', '2', *opts, src_other.as_posix(), src[2].as_posix(),
+         dir1.as_posix() + '/'],
+        ['xrdcp', '-r', *opts, (tmp_path / 'src').as_posix(), (dir1 / 'sub').as_posix()],
+        ['xrdcp', *opts, src[3].as_posix(), (dir1 / 'file_3.txt').as_posix()]
+    ]
+
+
 @pytest.mark.skipif(not afs_accessible, reason="AFS is not accessible.")
 @pytest.mark.parametrize("afs_cmd", [0, 1], ids=["xrdcp", "mount"])
 def test_file_io_afs(afs_cmd, test_user):
@@ -82,8 +145,7 @@ def test_file_io_afs(afs_cmd, test_user):
 
     # Make a link to AFS
     path_afs_link = FsPath("~/afs_test").expanduser()
-    if path_afs_link.lexists():
-        path_afs_link.unlink()
+    path_afs_link.unlink(missing_ok=True)
     path_afs_link.symlink_to(FsPath(_afs_test_path(test_user)))
 
     # Copy one file
@@ -92,10 +154,9 @@ def test_file_io_afs(afs_cmd, test_user):
     assert local_file_1.exists()
     with pytest.raises(NotADirectoryError, match="is not a directory."):
         local_file_1.rmdir()
-    target = FsPath("~/afs_test/default_file_1.txt").expanduser()
+    target = path_afs_link / "default_file_1.txt"
     assert isinstance(target, AfsPath)
-    if target.exists():
-        target.unlink()
+    target.unlink(missing_ok=True)
     local_file_1.copy_to("~/afs_test/")
     assert target.exists()
     assert local_file_1.exists()
@@ -106,10 +167,9 @@ def test_file_io_afs(afs_cmd, test_user):
     local_file_2 = FsPath("default_file_2.txt")
     local_file_2.touch()
     assert local_file_2.exists()
-    target = FsPath("~/afs_test/default_file_2.txt").expanduser()
+    target = path_afs_link / "default_file_2.txt"
     assert isinstance(target, AfsPath)
-    if target.exists():
-        target.unlink()
+    target.unlink(missing_ok=True)
     local_file_2.move_to("~/afs_test/")
     assert target.exists()
     assert not local_file_2.exists()
@@ -124,34 +184,29 @@ def test_file_io_afs(afs_cmd, test_user):
         file.touch()
         assert file.exists()
         local_files.append(file)
-    for i in range(1, 8):
-        target = FsPath(f"~/afs_test/default_file_{i}.txt").expanduser()
-        if target.exists():
-            target.unlink()
+    _cleanup_default_files(path_afs_link)
     cp(*local_files, "~/afs_test/")
     for i in range(1, 8):
-        target = FsPath(f"~/afs_test/default_file_{i}.txt").expanduser()
-        assert target.exists()
-        target.unlink()
-        assert not target.exists()
+        target = path_afs_link / f"default_file_{i}.txt"
+        target.unlink()  # Raises FileNotFoundError if the copy/move failed
     for file in local_files:
         assert file.exists()
 
     # Move several files
     mv(*local_files, "~/afs_test/")
     for i in range(1, 8):
-        target = FsPath(f"~/afs_test/default_file_{i}.txt").expanduser()
-        assert target.exists()
-        target.unlink()
-        assert not target.exists()
+        target = path_afs_link / f"default_file_{i}.txt"
+        target.unlink()  # Raises FileNotFoundError if the copy/move failed
     for file in local_files:
         assert not file.exists()
 
     # Make a directory
-    dir_path = FsPath("~/afs_test/Blibo").expanduser()
-    if dir_path.exists():
+    dir_path = path_afs_link / "Blibo"
+    try:
+        dir_path.mkdir()
+    except FileExistsError:
         dir_path.rmtree()
-    dir_path.mkdir()
+        dir_path.mkdir()
     assert dir_path.exists()
     assert dir_path.is_dir()
     assert not dir_path.is_file()
@@ -174,24 +229,26 @@ def test_file_io_afs(afs_cmd, test_user):
     for file in local_files:
         assert not file.exists()
     for i in range(1, 8):
-        target = FsPath(f"~/afs_test/Blibo/default_file_{i}.txt").expanduser()
+        target = path_afs_link / f"Blibo/default_file_{i}.txt"
         assert target.exists()
     # Copy the directory to a new directory
-    new_dir_path = FsPath("~/afs_test/BliboContainer").expanduser()
-    if new_dir_path.exists():
+    new_dir_path = path_afs_link / "BliboContainer"
+    try:
+        new_dir_path.mkdir()
+    except FileExistsError:
         new_dir_path.rmtree()
-    new_dir_path.mkdir()
+        new_dir_path.mkdir()
     assert new_dir_path.exists()
     # First, fail to copy the directory because recursive is False
     stdout = dir_path.copy_to(new_dir_path, recursive=False)
-    assert not FsPath("~/afs_test/BliboContainer/Blibo").exists()
+    assert not (path_afs_link / "BliboContainer/Blibo").exists()
     assert stdout.startswith("cp: -r not specified; omitting directory")
     # Now copy the directory
     dir_path.copy_to(new_dir_path)
     # Check the copy was successful
-    assert FsPath("~/afs_test/BliboContainer/Blibo").exists()
+    assert (path_afs_link / "BliboContainer/Blibo").exists()
     for i in range(1, 8):
-        target = FsPath(f"~/afs_test/BliboContainer/Blibo/default_file_{i}.txt").expanduser()
+        target = path_afs_link / f"BliboContainer/Blibo/default_file_{i}.txt"
         assert target.exists()
     # Check the originals are still present
     assert dir_path.exists()
@@ -206,7 +263,7 @@ def test_file_io_afs(afs_cmd, test_user):
     dir_path.rmtree()
     assert not dir_path.exists()
     # Move the new folder back
-    last_dir_path = FsPath("~/afs_test/BliboContainer/Blibo").expanduser()
+    last_dir_path = path_afs_link / "BliboContainer/Blibo"
     last_dir_path.move_to(last_dir_path / '../..')
     assert not last_dir_path.exists()
     assert new_dir_path.exists()
@@ -244,8 +301,7 @@ def test_file_io_eos(eos_cmd, test_user):
 
     # Make a link to EOS
     path_eos_link = FsPath("~/eos_test").expanduser()
-    if path_eos_link.lexists():
-        path_eos_link.unlink()
+    path_eos_link.unlink(missing_ok=True)
     path_eos_link.symlink_to(FsPath(_eos_test_path(test_user)))
 
     # Copy one file
@@ -254,10 +310,9 @@ def test_file_io_eos(eos_cmd, test_user):
     assert local_file_1.exists()
     with pytest.raises(NotADirectoryError, match="is not a directory."):
         local_file_1.rmdir()
-    target = FsPath("~/eos_test/default_file_1.txt").expanduser()
+    target = path_eos_link / "default_file_1.txt"
     assert isinstance(target, EosPath)
-    if target.exists():
-        target.unlink()
+    target.unlink(missing_ok=True)
     local_file_1.copy_to("~/eos_test/")
     assert target.exists()
     assert local_file_1.exists()
@@ -268,10 +323,9 @@ def test_file_io_eos(eos_cmd, test_user):
     local_file_2 = FsPath("default_file_2.txt")
     local_file_2.touch()
     assert local_file_2.exists()
-    target = FsPath("~/eos_test/default_file_2.txt").expanduser()
+    target = path_eos_link / "default_file_2.txt"
     assert isinstance(target, EosPath)
-    if target.exists():
-        target.unlink()
+    target.unlink(missing_ok=True)
     local_file_2.move_to("~/eos_test/")
     assert target.exists()
     assert not local_file_2.exists()
@@ -286,34 +340,29 @@ def test_file_io_eos(eos_cmd, test_user):
         file.touch()
         assert file.exists()
         local_files.append(file)
-    for i in range(1, 8):
-        target = FsPath(f"~/eos_test/default_file_{i}.txt").expanduser()
-        if target.exists():
-            target.unlink()
+    _cleanup_default_files(path_eos_link)
     cp(*local_files, "~/eos_test/")
     for i in range(1, 8):
-        target = FsPath(f"~/eos_test/default_file_{i}.txt")
-        assert target.exists()
-        target.unlink()
-        assert not target.exists()
+        target = path_eos_link / f"default_file_{i}.txt"
+        target.unlink()  # Raises FileNotFoundError if the copy/move failed
     for file in local_files:
         assert file.exists()
 
     # Move several files
     mv(*local_files, "~/eos_test/")
     for i in range(1, 8):
-        target = FsPath(f"~/eos_test/default_file_{i}.txt").expanduser()
-        assert target.exists()
-        target.unlink()
-        assert not target.exists()
+        target = path_eos_link / f"default_file_{i}.txt"
+        target.unlink()  # Raises FileNotFoundError if the copy/move failed
     for file in local_files:
         assert not file.exists()
 
     # Make a directory
-    dir_path = FsPath("~/eos_test/Blibo").expanduser()
-    if dir_path.exists():
+    dir_path = path_eos_link / "Blibo"
+    try:
+        dir_path.mkdir()
+    except FileExistsError:
         dir_path.rmtree()
-    dir_path.mkdir()
+        dir_path.mkdir()
     assert dir_path.exists()
     assert dir_path.is_dir()
     assert not dir_path.is_file()
@@ -336,14 +385,15 @@ def test_file_io_eos(eos_cmd, test_user):
     for file in local_files:
         assert not file.exists()
     for i in range(1, 8):
-        target = FsPath(f"~/eos_test/Blibo/default_file_{i}.txt").expanduser()
+        target = path_eos_link / f"Blibo/default_file_{i}.txt"
         assert target.exists()
     # Copy the directory to a new directory
-    new_dir_path = FsPath("~/eos_test/BliboContainer").expanduser()
-    if new_dir_path.exists():
+    new_dir_path = path_eos_link / "BliboContainer"
+    try:
+        new_dir_path.mkdir()
+    except FileExistsError:
         new_dir_path.rmtree()
-        assert not new_dir_path.exists()
-    new_dir_path.mkdir()
+        new_dir_path.mkdir()
     assert new_dir_path.exists()
     # First, fail to copy the directory because recursive is False
     stdout = dir_path.copy_to(new_dir_path, recursive=False)
@@ -352,9 +402,9 @@ def test_file_io_eos(eos_cmd, test_user):
     # Now copy the directory
     dir_path.copy_to(new_dir_path)
     # Check the copy was successful
-    assert FsPath("~/eos_test/BliboContainer/Blibo").exists()
+    assert (path_eos_link / "BliboContainer/Blibo").exists()
     for i in range(1, 8):
-        target = FsPath(f"~/eos_test/BliboContainer/Blibo/default_file_{i}.txt").expanduser()
+        target = path_eos_link / f"BliboContainer/Blibo/default_file_{i}.txt"
         assert target.exists()
     # Check the originals are still present
     assert dir_path.exists()
@@ -370,7 +420,7 @@ def test_file_io_eos(eos_cmd, test_user):
     dir_path.rmtree()
     assert not dir_path.exists()
     # Move the new folder back
-    last_dir_path = FsPath("~/eos_test/BliboContainer/Blibo").expanduser()
+    last_dir_path = path_eos_link / "BliboContainer/Blibo"
     last_dir_path.move_to(last_dir_path / '../..')
     assert not last_dir_path.exists()
     assert new_dir_path.exists()
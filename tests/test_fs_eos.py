@@ -8,75 +8,118 @@ import os
 import pytest
 
 from xaux.fs import *
-from xaux.fs.eos_methods import EOS_CELL
+from xaux.fs.eos_methods import EOS_CELL, _eos_dir_snapshot
 
-from test_fs import _test_instantiation, _afs_test_path, _eos_test_path
+from test_fs import _test_instantiation, _afs_test_path, _eos_test_path, _cwd_is_local, \
+                    EosSystemPath, EosNonSystemPath
 
 
+# Every operation runs into the same error, so one path (and one parametrized test per
+# operation) suffices. The symlink targets are taken in the same directory.
 @pytest.mark.skipif(eos_accessible, reason="EOS is accessible.")
-def test_touch_and_symlinks_eos_no_access(test_user):
-    eos_path = _eos_test_path(test_user, skip=False)
-    file = (Path(eos_path) / "example_file.txt").as_posix()
-    link = (Path(eos_path) / "example_link.txt").as_posix()
-    broken_link = (Path(eos_path) / "example_broken_link.txt").as_posix()
-    # Create and test with FsPath
-    path_file = FsPath(file)
-    path_link = FsPath(link)
-    path_broken_link = FsPath(broken_link)
-    assert isinstance(path_file, EosPath)
-    assert isinstance(path_link, EosPath)
-    assert isinstance(path_broken_link, EosPath)
-    with pytest.raises(OSError, match="EOS is not installed on your system."):
-        path_file.touch()
+@pytest.mark.parametrize("method, target", [("touch", None),
+                                            ("symlink_to", "example_file.txt"),
+                                            ("symlink_to", "example_file.txt_nonexistent")],
+                         ids=["touch", "symlink", "broken symlink"])
+def test_touch_and_symlinks_eos_no_access(test_user, method, target):
+    path = FsPath(_eos_test_path(test_user, skip=False)) / "example_link.txt"
+    assert isinstance(path, EosPath)
+    args = [] if target is None else [path.parent / target]
     with pytest.raises(OSError, match="EOS is not installed on your system."):
-        path_link.symlink_to(path_file)
-    with pytest.raises(OSError, match="EOS is not installed on your system."):
-        path_broken_link.symlink_to(f"{file}_nonexistent")
+        getattr(path, method)(*args)
+
+
+@pytest.fixture(scope="module")
+def eos_example_paths(eos_scratch):
+    return [eos_scratch / "example_file.txt", eos_scratch / "example_link.txt",
+            eos_scratch / "example_broken_link.txt"]
+
+@pytest.fixture
+def clean_eos_example_paths(eos_example_paths):
+    for path in eos_example_paths:
+        path.unlink(missing_ok=True)
+    return eos_example_paths
 
 
 @pytest.mark.skipif(not eos_accessible, reason="EOS is not accessible.")
-def test_touch_and_symlinks_eos_access(test_user):
-    file = (Path(_eos_test_path(test_user)) / "example_file.txt").as_posix()
-    link = (Path(_eos_test_path(test_user)) / "example_link.txt").as_posix()
-    broken_link = (Path(_eos_test_path(test_user)) / "example_broken_link.txt").as_posix()
-    # Create and test with FsPath
-    path_file = FsPath(file)
-    path_link = FsPath(link)
-    path_broken_link = FsPath(broken_link)
+def test_touch_and_symlinks_eos_access(clean_eos_example_paths):
+    path_file, path_link, path_broken_link = clean_eos_example_paths
     assert isinstance(path_file, EosPath)
     assert isinstance(path_link, EosPath)
     assert isinstance(path_broken_link, EosPath)
     for path in [path_file, path_link, path_broken_link]:
-        if path.lexists():
-            path.unlink()
         assert not path.exists()
         assert not path.lexists()
     path_file.touch(exist_ok=False)
     path_link.symlink_to(path_file)
-    path_broken_link.symlink_to(f"{file}_nonexistent")
-    assert path_file.exists()
-    assert path_link.exists()
-    assert path_link.lexists()
-    assert path_link.is_symlink()
-    assert not path_link.is_broken_symlink()
-    assert path_broken_link.lexists()
-    assert not path_broken_link.exists()
-    assert path_broken_link.is_symlink()
-    assert path_broken_link.is_broken_symlink()
+    path_broken_link.symlink_to(f"{path_file}_nonexistent")
+    # All files live in the same directory, so one listing answers all checks
+    with _eos_dir_snapshot(path_file.parent):
+        assert path_file.exists()
+        assert path_link.exists()
+        assert path_link.lexists()
+        assert path_link.is_symlink()
+        assert not path_link.is_broken_symlink()
+        assert path_broken_link.lexists()
+        assert not path_broken_link.exists()
+        assert path_broken_link.is_symlink()
+        assert path_broken_link.is_broken_symlink()
     # Delete
     path_file.unlink()
     path_link.unlink()
     path_broken_link.unlink()
 
 
+def test_eos_dir_snapshot(tmp_path, monkeypatch):
+    # Offline check of the `eos ls -l` parsing, with a canned listing
+    import xaux.fs.eos_methods as eos_methods
+    listing = ("-rw-r--r--   1 someone  zp        1024 Oct 16 10:47 example_file.txt\n"
+               "drwxr-xr-x   1 someone  zp           0 Oct 16 10:47 example dir\n"
+               "lrwxrwxrwx   1 someone  zp           0 Oct 16 10:47 example_link.txt -> example_file.txt\n")
+    commands = []
+    def fake_run_eos(cmds, mgm, **kwargs):
+        commands.append(cmds[:2])
+        return True, (listing if cmds[:2] == ['eos', 'ls'] else '')
+    monkeypatch.setattr(eos_methods, '_run_eos', fake_run_eos)
+    monkeypatch.setattr(eos_methods, 'eos_accessible', True)
+
+    directory = FsPath('/eos/user/s/someone/snapshot_test')
+    with _eos_dir_snapshot(directory):
+        assert (directory / "example_file.txt").is_file()
+        assert (directory / "example_file.txt").exists()
+        assert not (directory / "example_file.txt").is_symlink()
+        assert (directory / "example dir").is_dir()
+        assert not (directory / "example dir").is_file()
+        assert (directory / "example_link.txt").is_symlink()
+        assert not (directory / "nonexistent.txt").exists()
+        assert not (directory / "nonexistent.txt").is_symlink()
+        # Only one listing is needed for all of the above
+        assert commands == [['eos', 'ls']]
+        # Paths outside of the directory are not answered from the snapshot
+        assert not (directory.parent / "example_file.txt").exists()
+        assert commands[-1] == ['eos', 'stat']
+        # Copying (or moving) files drops the snapshot
+        (tmp_path / "source.txt").touch()
+        cp(tmp_path / "source.txt", tmp_path / "target.txt")
+        assert not (directory / "example_file.txt").exists()
+        assert commands[-1] == ['eos', 'stat']
+    assert eos_methods._dir_snapshot.get() is None
+
+    # A drop inside a nested snapshot does not bring back the (equally stale) outer one
+    with _eos_dir_snapshot(directory):
+        with _eos_dir_snapshot(directory / "example dir"):
+            cp(tmp_path / "source.txt", tmp_path / "target.txt")
+        assert eos_methods._dir_snapshot.get() is None
+        assert not (directory / "example_file.txt").exists()
+        assert commands[-1] == ['eos', 'stat']
+    assert eos_methods._dir_snapshot.get() is None
 
-@pytest.mark.skipif(not isinstance(FsPath.cwd(), LocalPath), reason="This test should be ran from a local path.")
+
+@pytest.mark.skipif(not _cwd_is_local, reason="This test should be ran from a local path.")
 def test_instantiation_eos(test_user):
-    EosSystemPath    = EosWindowsPath if os.name == 'nt' else EosPosixPath
-    EosNonSystemPath = EosPosixPath   if os.name == 'nt' else EosWindowsPath
-    file_abs = (Path(_eos_test_path(test_user, skip=False)) / "example_eos_file.txt").as_posix()
-    if eos_accessible and Path(file_abs).exists():
-        Path(file_abs).unlink()
+    file_abs = os.path.join(_eos_test_path(test_user, skip=False), "example_eos_file.txt")
+    if eos_accessible:
+        Path(file_abs).unlink(missing_ok=True)
     this_path = EosSystemPath(file_abs)
     # Test non-existing file
     print(f"Testing EosPath with {file_abs} (non-existent)...")
@@ -89,28 +132,28 @@ def test_instantiation_eos(test_user):
 
 
 @pytest.mark.skipif(not eos_accessible, reason="EOS is not accessible.")
-@pytest.mark.skipif(not isinstance(FsPath.cwd(), LocalPath), reason="This test should be ran from a local path.")
-def test_instantiation_eos_access(test_user):
-    EosSystemPath    = EosWindowsPath if os.name == 'nt' else EosPosixPath
-    EosNonSystemPath = EosPosixPath   if os.name == 'nt' else EosWindowsPath
+@pytest.mark.skipif(not _cwd_is_local, reason="This test should be ran from a local path.")
+def test_instantiation_eos_access(eos_scratch, eos_scratch_resolved, tmp_path, monkeypatch):
+    # The local files and links are created in a private directory as well
+    monkeypatch.chdir(tmp_path)
     _file_rel = "example_eos_file.txt"
     _link_rel = "example_eos_relative_link.txt"
-    file_abs = (Path(_eos_test_path(test_user)) / _file_rel).as_posix()
-    rel_link = (Path(_eos_test_path(test_user)) / _link_rel).as_posix() # on EOS, will point (relative) to _file_rel
+    file_abs = os.path.join(eos_scratch, _file_rel)
+    rel_link = os.path.join(eos_scratch, _link_rel) # on EOS, will point (relative) to _file_rel
     abs_link = "example_eos_absolute_link.txt"        # on local, will point (absolute) to file_abs
     fs_link = "eos_test"                              # on local, will point to absolute EOS folder
-    file_fs = (Path(fs_link) / _file_rel).as_posix()  # on local linked folder, equal to file_abs
-    rel_link_fs = (Path(fs_link) / _link_rel).as_posix()   # on local linked folder, will point (relative) to _file_rel
+    file_fs = os.path.join(fs_link, _file_rel)  # on local linked folder, equal to file_abs
+    rel_link_fs = os.path.join(fs_link, _link_rel)   # on local linked folder, will point (relative) to _file_rel
     file_local = "example_file.txt"
-    link_fs_to_local = (Path(fs_link) / "example_eos_link_to_fs.txt").as_posix() # on local linked folder, will point (absolute) to local file
-    abs_link_fs = (Path(fs_link) / "example_eos_double_link.txt").as_posix()     # on local linked folder, will point (absolute) to abs_link
+    link_fs_to_local = os.path.join(fs_link, "example_eos_link_to_fs.txt") # on local linked folder, will point (absolute) to local file
+    abs_link_fs = os.path.join(fs_link, "example_eos_double_link.txt")     # on local linked folder, will point (absolute) to abs_link
 
     # Clean start
     for f in [file_abs, rel_link, abs_link, file_fs, rel_link_fs, \
               file_local, link_fs_to_local, abs_link_fs, fs_link]:   # fs_link should go last..
-        if FsPath(f).lexists():
-            FsPath(f).unlink()
-    this_path = EosSystemPath(file_abs).resolve()
+        FsPath(f).unlink(missing_ok=True)
+    # The file does not exist yet, so resolving it only resolves the (cached) directory
+    this_path = eos_scratch_resolved / _file_rel
 
     # Test with existing file
     print(f"Testing EosPath with {file_abs} (existent)...")
@@ -152,7 +195,7 @@ def test_instantiation_eos_access(test_user):
     # Create local link to EOS folder
     print(f"Testing EosPath with {fs_link} (local link to EOS folder)...")
     path_fs_link = FsPath(fs_link)
-    path_fs_link.symlink_to(FsPath(_eos_test_path(test_user)))
+    path_fs_link.symlink_to(eos_scratch)
     assert isinstance(path_fs_link, LocalPath)
     assert path_fs_link.exists()
     assert path_fs_link.is_symlink()
@@ -231,32 +274,36 @@ def test_instantiation_eos_access(test_user):
 @pytest.mark.skipif(EOS_CELL != "cern.ch", reason="This test is only valid for the CERN EOS instance.")
 def test_eos_components(test_user):
     _file_rel = "example_eos_file_components.txt"
-    file_ref = (Path(_eos_test_path(test_user, skip=False)) / _file_rel).as_posix()
+    file_ref = os.path.join(_eos_test_path(test_user, skip=False), _file_rel)
     this_path = EosPath(file_ref)
     assert isinstance(this_path, EosPath)
-    files = [file_ref]
-    files.append(file_ref.replace("/user/", "/home/"))
-    files.append(file_ref.replace("/user/", "/user-"))
-    files.append(file_ref.replace("/user/", "/home-"))
-    for file in files[:4]:
-        files.append(f"root://eosuser.cern.ch/{file}")
-        files.append(f"root://eoshome.cern.ch/{file}")
+    base = [file_ref, file_ref.replace("/user/", "/home/"),
+            file_ref.replace("/user/", "/user-"), file_ref.replace("/user/", "/home-")]
+    files = base + [f"root://{mgm}/{file}" for file in base
+                    for mgm in ["eosuser.cern.ch", "eoshome.cern.ch"]]
+    expected = ("user", "root://eosuser.cern.ch", file_ref, f"root://eosuser.cern.ch/{file_ref}")
+    # The forms with an MGM prefix map onto the same path as their base form, so each
+    # distinct path only needs to be resolved once (every resolve is a round-trip to EOS)
+    resolved = {}
     for file in files:
         print(f"Testing EosPath components with {file}...")
         path = FsPath(file)
         if eos_accessible:
-            assert path.resolve() == this_path
+            if str(path) not in resolved:
+                resolved[str(path)] = path.resolve()
+            assert resolved[str(path)] == this_path
         assert isinstance(path, EosPath)
-        assert path.eos_instance == "user"
-        assert path.mgm == f"root://eosuser.cern.ch"
-        assert path.eos_path == file_ref
-        assert path.eos_path_full == f"{path.mgm}/{file_ref}"
-    broken_mgm_files = [f"root://eoshome.cern.ch{file_ref}"]
-    broken_mgm_files.append(f"root:/eoshome.cern.ch/{file_ref}")
-    broken_mgm_files.append(f"root://afshome.cern.ch/{file_ref}")
-    for file in broken_mgm_files:
-        with pytest.raises(ValueError, match="Invalid EosPath specification"):
-            path = EosPath(file)
-    with pytest.raises(ValueError, match="Unknown EosPath specification"):
-        path = FsPath(broken_mgm_files[-1])
+        assert (path.eos_instance, path.mgm, path.eos_path, path.eos_path_full) == expected
+
 
+@pytest.mark.skipif(EOS_CELL != "cern.ch", reason="This test is only valid for the CERN EOS instance.")
+@pytest.mark.parametrize("cls, broken_mgm, match", [
+        (EosPath, "root://eoshome.cern.ch{}",  "Invalid EosPath specification"),
+        (EosPath, "root:/eoshome.cern.ch/{}",  "Invalid EosPath specification"),
+        (EosPath, "root://afshome.cern.ch/{}", "Invalid EosPath specification"),
+        (FsPath,  "root://afshome.cern.ch/{}", "Unknown EosPath specification"),
+    ], ids=["missing slash", "broken protocol", "unknown mgm", "unknown mgm FsPath"])
+def test_eos_components_broken_mgm(test_user, cls, broken_mgm, match):
+    file_ref = os.path.join(_eos_test_path(test_user, skip=False), "example_eos_file_components.txt")
+    with pytest.raises(ValueError, match=match):
+        cls(broken_mgm.format(file_ref))
@@ -3,6 +3,8 @@
 # Copyright (c) CERN, 2024.                 #
 # ######################################### #
 
+import pytest
+
 from xaux.tools import count_arguments, count_required_arguments, count_optional_arguments, \
                        has_variable_length_arguments, has_variable_length_positional_arguments, \
                        has_variable_length_keyword_arguments
@@ -52,159 +54,41 @@ def _func_test_21(a, /, b, c, *, d=3, e=89, f=897, g=-0.8, **kwargs):
     pass
 
 
-def test_count_arguments():
-    assert count_arguments(_func_test_1) == 0
-    assert count_arguments(_func_test_2) == 1
-    assert count_arguments(_func_test_3) == 2
-    assert count_arguments(_func_test_4) == 1
-    assert count_arguments(_func_test_5) == 2
-    assert count_arguments(_func_test_6) == 0
-    assert count_arguments(_func_test_7) == 3
-    assert count_arguments(_func_test_8) == 2
-    assert count_arguments(_func_test_9) == 4
-    assert count_arguments(_func_test_10) == 0
-    assert count_arguments(_func_test_11) == 2
-    assert count_arguments(_func_test_12) == 0
-    assert count_arguments(_func_test_13) == 1
-    assert count_arguments(_func_test_14) == 1
-    assert count_arguments(_func_test_15) == 3
-    assert count_arguments(_func_test_16) == 2
-    assert count_arguments(_func_test_17) == 7
-    assert count_arguments(_func_test_18) == 1
-    assert count_arguments(_func_test_19) == 2
-    assert count_arguments(_func_test_20) == 7
-    assert count_arguments(_func_test_21) == 7
-    assert count_arguments(_func_test_1, count_variable_length_args=True) == 0
-    assert count_arguments(_func_test_2, count_variable_length_args=True) == 1
-    assert count_arguments(_func_test_3, count_variable_length_args=True) == 2
-    assert count_arguments(_func_test_4, count_variable_length_args=True) == 1
-    assert count_arguments(_func_test_5, count_variable_length_args=True) == 2
-    assert count_arguments(_func_test_6, count_variable_length_args=True) == 1
-    assert count_arguments(_func_test_7, count_variable_length_args=True) == 4
-    assert count_arguments(_func_test_8, count_variable_length_args=True) == 3
-    assert count_arguments(_func_test_9, count_variable_length_args=True) == 5
-    assert count_arguments(_func_test_10, count_variable_length_args=True) == 1
-    assert count_arguments(_func_test_11, count_variable_length_args=True) == 3
-    assert count_arguments(_func_test_12, count_variable_length_args=True) == 2
-    assert count_arguments(_func_test_13, count_variable_length_args=True) == 2
-    assert count_arguments(_func_test_14, count_variable_length_args=True) == 3
-    assert count_arguments(_func_test_15, count_variable_length_args=True) == 4
-    assert count_arguments(_func_test_16, count_variable_length_args=True) == 4
-    assert count_arguments(_func_test_17, count_variable_length_args=True) == 9
-    assert count_arguments(_func_test_18, count_variable_length_args=True) == 1
-    assert count_arguments(_func_test_19, count_variable_length_args=True) == 2
-    assert count_arguments(_func_test_20, count_variable_length_args=True) == 9
-    assert count_arguments(_func_test_21, count_variable_length_args=True) == 8
-
-
-def test_count_required_arguments():
-    assert count_required_arguments(_func_test_1) == 0
-    assert count_required_arguments(_func_test_2) == 1
-    assert count_required_arguments(_func_test_3) == 2
-    assert count_required_arguments(_func_test_4) == 0
-    assert count_required_arguments(_func_test_5) == 1
-    assert count_required_arguments(_func_test_6) == 0
-    assert count_required_arguments(_func_test_7) == 3
-    assert count_required_arguments(_func_test_8) == 0
-    assert count_required_arguments(_func_test_9) == 2
-    assert count_required_arguments(_func_test_10) == 0
-    assert count_required_arguments(_func_test_11) == 2
-    assert count_required_arguments(_func_test_12) == 0
-    assert count_required_arguments(_func_test_13) == 0
-    assert count_required_arguments(_func_test_14) == 1
-    assert count_required_arguments(_func_test_15) == 2
-    assert count_required_arguments(_func_test_16) == 0
-    assert count_required_arguments(_func_test_17) == 3
-    assert count_required_arguments(_func_test_18) == 1
-    assert count_required_arguments(_func_test_19) == 1
-    assert count_required_arguments(_func_test_20) == 3
-    assert count_required_arguments(_func_test_21) == 3
-
+# Expected results per function: total arguments, total including variable-length ones,
+# required, optional, and whether it has variable-length (any, positional, keyword) arguments
+CASES = [
+    # func         tot, totvar, req,   opt,   var,  varp,  vark
+    (_func_test_1,      0,     0,     0,     0, False, False, False),
+    (_func_test_2,      1,     1,     1,     0, False, False, False),
+    (_func_test_3,      2,     2,     2,     0, False, False, False),
+    (_func_test_4,      1,     1,     0,     1, False, False, False),
+    (_func_test_5,      2,     2,     1,     1, False, False, False),
+    (_func_test_6,      0,     1,     0,     0,  True,  True, False),
+    (_func_test_7,      3,     4,     3,     0,  True,  True, False),
+    (_func_test_8,      2,     3,     0,     2,  True,  True, False),
+    (_func_test_9,      4,     5,     2,     2,  True,  True, False),
+    (_func_test_10,     0,     1,     0,     0,  True, False,  True),
+    (_func_test_11,     2,     3,     2,     0,  True, False,  True),
+    (_func_test_12,     0,     2,     0,     0,  True,  True,  True),
+    (_func_test_13,     1,     2,     0,     1,  True, False,  True),
+    (_func_test_14,     1,     3,     1,     0,  True,  True,  True),
+    (_func_test_15,     3,     4,     2,     1,  True, False,  True),
+    (_func_test_16,     2,     4,     0,     2,  True,  True,  True),
+    (_func_test_17,     7,     9,     3,     4,  True,  True,  True),
+    (_func_test_18,     1,     1,     1,     0, False, False, False),
+    (_func_test_19,     2,     2,     1,     1, False, False, False),
+    (_func_test_20,     7,     9,     3,     4,  True,  True,  True),
+    (_func_test_21,     7,     8,     3,     4,  True, False,  True),
+]
 
-def test_count_optional_arguments():
-    assert count_optional_arguments(_func_test_1) == 0
-    assert count_optional_arguments(_func_test_2) == 0
-    assert count_optional_arguments(_func_test_3) == 0
-    assert count_optional_arguments(_func_test_4) == 1
-    assert count_optional_arguments(_func_test_5) == 1
-    assert count_optional_arguments(_func_test_6) == 0
-    assert count_optional_arguments(_func_test_7) == 0
-    assert count_optional_arguments(_func_test_8) == 2
-    assert count_optional_arguments(_func_test_9) == 2
-    assert count_optional_arguments(_func_test_10) == 0
-    assert count_optional_arguments(_func_test_11) == 0
-    assert count_optional_arguments(_func_test_12) == 0
-    assert count_optional_arguments(_func_test_13) == 1
-    assert count_optional_arguments(_func_test_14) == 0
-    assert count_optional_arguments(_func_test_15) == 1
-    assert count_optional_arguments(_func_test_16) == 2
-    assert count_optional_arguments(_func_test_17) == 4
-    assert count_optional_arguments(_func_test_18) == 0
-    assert count_optional_arguments(_func_test_19) == 1
-    assert count_optional_arguments(_func_test_20) == 4
-    assert count_optional_arguments(_func_test_21) == 4
 
-def test_has_variable_length_arguments():
-    assert has_variable_length_arguments(_func_test_1) is False
-    assert has_variable_length_arguments(_func_test_2) is False
-    assert has_variable_length_arguments(_func_test_3) is False
-    assert has_variable_length_arguments(_func_test_4) is False
-    assert has_variable_length_arguments(_func_test_5) is False
-    assert has_variable_length_arguments(_func_test_6) is True
-    assert has_variable_length_arguments(_func_test_7) is True
-    assert has_variable_length_arguments(_func_test_8) is True
-    assert has_variable_length_arguments(_func_test_9) is True
-    assert has_variable_length_arguments(_func_test_10) is True
-    assert has_variable_length_arguments(_func_test_11) is True
-    assert has_variable_length_arguments(_func_test_12) is True
-    assert has_variable_length_arguments(_func_test_13) is True
-    assert has_variable_length_arguments(_func_test_14) is True
-    assert has_variable_length_arguments(_func_test_15) is True
-    assert has_variable_length_arguments(_func_test_16) is True
-    assert has_variable_length_arguments(_func_test_17) is True
-    assert has_variable_length_arguments(_func_test_18) is False
-    assert has_variable_length_arguments(_func_test_19) is False
-    assert has_variable_length_arguments(_func_test_20) is True
-    assert has_variable_length_arguments(_func_test_21) is True
-    assert has_variable_length_positional_arguments(_func_test_1) is False
-    assert has_variable_length_positional_arguments(_func_test_2) is False
-    assert has_variable_length_positional_arguments(_func_test_3) is False
-    assert has_variable_length_positional_arguments(_func_test_4) is False
-    assert has_variable_length_positional_arguments(_func_test_5) is False
-    assert has_variable_length_positional_arguments(_func_test_6) is True
-    assert has_variable_length_positional_arguments(_func_test_7) is True
-    assert has_variable_length_positional_arguments(_func_test_8) is True
-    assert has_variable_length_positional_arguments(_func_test_9) is True
-    assert has_variable_length_positional_arguments(_func_test_10) is False
-    assert has_variable_length_positional_arguments(_func_test_11) is False
-    assert has_variable_length_positional_arguments(_func_test_12) is True
-    assert has_variable_length_positional_arguments(_func_test_13) is False
-    assert has_variable_length_positional_arguments(_func_test_14) is True
-    assert has_variable_length_positional_arguments(_func_test_15) is False
-    assert has_variable_length_positional_arguments(_func_test_16) is True
-    assert has_variable_length_positional_arguments(_func_test_17) is True
-    assert has_variable_length_positional_arguments(_func_test_18) is False
-    assert has_variable_length_positional_arguments(_func_test_19) is False
-    assert has_variable_length_positional_arguments(_func_test_20) is True
-    assert has_variable_length_positional_arguments(_func_test_21) is False
-    assert has_variable_length_keyword_arguments(_func_test_1) is False
-    assert has_variable_length_keyword_arguments(_func_test_2) is False
-    assert has_variable_length_keyword_arguments(_func_test_3) is False
-    assert has_variable_length_keyword_arguments(_func_test_4) is False
-    assert has_variable_length_keyword_arguments(_func_test_5) is False
-    assert has_variable_length_keyword_arguments(_func_test_6) is False
-    assert has_variable_length_keyword_arguments(_func_test_7) is False
-    assert has_variable_length_keyword_arguments(_func_test_8) is False
-    assert has_variable_length_keyword_arguments(_func_test_9) is False
-    assert has_variable_length_keyword_arguments(_func_test_10) is True
-    assert has_variable_length_keyword_arguments(_func_test_11) is True
-    assert has_variable_length_keyword_arguments(_func_test_12) is True
-    assert has_variable_length_keyword_arguments(_func_test_13) is True
-    assert has_variable_length_keyword_arguments(_func_test_14) is True
-    assert has_variable_length_keyword_arguments(_func_test_15) is True
-    assert has_variable_length_keyword_arguments(_func_test_16) is True
-    assert has_variable_length_keyword_arguments(_func_test_17) is True
-    assert has_variable_length_keyword_arguments(_func_test_18) is False
-    assert has_variable_length_keyword_arguments(_func_test_19) is False
-    assert has_variable_length_keyword_arguments(_func_test_20) is True
-    assert has_variable_length_keyword_arguments(_func_test_21) is True
+@pytest.mark.parametrize("func, tot, totvar, req, opt, var, varp, vark", CASES,
+                         ids=[case[0].__name__ for case in CASES])
+def test_signature(func, tot, totvar, req, opt, var, varp, vark):
+    assert count_arguments(func) == tot
+    assert count_arguments(func, count_variable_length_args=True) == totvar
+    assert count_required_arguments(func) == req
+    assert count_optional_arguments(func) == opt
+    assert has_variable_length_arguments(func) is var
+    assert has_variable_length_positional_arguments(func) is varp
+    assert has_variable_length_keyword_arguments(func) is vark
@@ -3,91 +3,41 @@
 # Copyright (c) CERN, 2025.                 #
 # ######################################### #
 
-from subprocess import run, TimeoutExpired
+import re
+import sys
+import pytest
+from time import sleep, time
+from subprocess import run, Popen, PIPE
 import numpy as np
 from xaux import timestamp, ranID, get_hash, FsPath
 
 
-def test_timestamp():
-    ts = timestamp()
-    ts_f = timestamp(in_filename=True)
-    ts_ms = timestamp(ms=True)
-    ts_us = timestamp(us=True)
-    ts_ms_f = timestamp(ms=True, in_filename=True)
+# Expected timestamp formats (validating structure and field lengths in one go)
+_timestamp_formats = {
+    'default':            ({},                               re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')),
+    'in_filename':        ({'in_filename': True},            re.compile(r'\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}')),
+    'ms':                 ({'ms': True},                     re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}')),
+    'us':                 ({'us': True},                     re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{6}')),
+    'ms and in_filename': ({'ms': True, 'in_filename': True}, re.compile(r'\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}\.\d{3}')),
+}
 
+# Translation tables that delete all allowed characters: a valid ID translates to ''
+_alnum       = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+_strip_alnum = str.maketrans('', '', _alnum)
+_strip_b64   = str.maketrans('', '', _alnum + '-_')
+
+# Reference hash of cronjob_example.py, to be updated whenever that file changes
+_expected_hash = ('d1c7c28446956c1cfd6e33c8e15313a280ff20456d3fbbc8f930d0911341a0365e906e'
+                  'bdac285ffd0aa7b9ee840ac1fd249318e7573b1173ef529eae23c14838')
+
+
+@pytest.mark.parametrize("kwargs, pattern", list(_timestamp_formats.values()),
+                         ids=list(_timestamp_formats))
+def test_timestamp(kwargs, pattern):
+    ts = timestamp(**kwargs)
     if ts.startswith('21'):
         raise RuntimeError("You really should not be using this code anymore...")
-
-    assert len(ts) == 19
-    assert len(ts_f) == 19
-    assert len(ts_ms) == 23
-    assert len(ts_us) == 26
-    assert len(ts_ms_f) == 23
-
-    assert len(ts.split()) == 2
-    assert len(ts.split()[0]) == 10
-    assert len(ts.split()[1]) == 8
-    assert len(ts.split()[0].split('-')) == 3
-    assert len(ts.split()[0].split('-')[0]) == 4
-    assert len(ts.split()[0].split('-')[1]) == 2
-    assert len(ts.split()[0].split('-')[2]) == 2
-    assert len(ts.split()[1].split(':')) == 3
-    assert len(ts.split()[1].split(':')[0]) == 2
-    assert len(ts.split()[1].split(':')[1]) == 2
-    assert len(ts.split()[1].split(':')[2]) == 2
-    assert len(ts_f.split('_')) == 2
-    assert len(ts_f.split('_')[0]) == 10
-    assert len(ts_f.split('_')[1]) == 8
-    assert len(ts_f.split('_')[0].split('-')) == 3
-    assert len(ts_f.split('_')[0].split('-')[0]) == 4
-    assert len(ts_f.split('_')[0].split('-')[1]) == 2
-    assert len(ts_f.split('_')[0].split('-')[2]) == 2
-    assert len(ts_f.split('_')[1].split('-')) == 3
-    assert len(ts_f.split('_')[1].split('-')[0]) == 2
-    assert len(ts_f.split('_')[1].split('-')[1]) == 2
-    assert len(ts_f.split('_')[1].split('-')[2]) == 2
-    assert len(ts_ms.split()) == 2
-    assert len(ts_ms.split()[0]) == 10
-    assert len(ts_ms.split()[1]) == 12
-    assert len(ts_ms.split()[0].split('-')) == 3
-    assert len(ts_ms.split()[0].split('-')[0]) == 4
-    assert len(ts_ms.split()[0].split('-')[1]) == 2
-    assert len(ts_ms.split()[0].split('-')[2]) == 2
-    assert len(ts_ms.split()[1].split(':')) == 3
-    assert len(ts_ms.split()[1].split(':')[0]) == 2
-    assert len(ts_ms.split()[1].split(':')[1]) == 2
-    assert len(ts_ms.split()[1].split(':')[2]) == 6
-    assert len(ts_ms.split()[1].split(':')[2].split('.')) == 2
-    assert len(ts_ms.split()[1].split(':')[2].split('.')[0]) == 2
-    assert len(ts_ms.split()[1].split(':')[2].split('.')[1]) == 3
-    assert len(ts_us.split()) == 2
-    assert len(ts_us.split()[0]) == 10
-    assert len(ts_us.split()[1]) == 15
-    assert len(ts_us.split()[0].split('-')) == 3
-    assert len(ts_us.split()[0].split('-')[0]) == 4
-    assert len(ts_us.split()[0].split('-')[1]) == 2
-    assert len(ts_us.split()[0].split('-')[2]) == 2
-    assert len(ts_us.split()[1].split(':')) == 3
-    assert len(ts_us.split()[1].split(':')[0]) == 2
-    assert len(ts_us.split()[1].split(':')[1]) == 2
-    assert len(ts_us.split()[1].split(':')[2]) == 9
-    assert len(ts_us.split()[1].split(':')[2].split('.')) == 2
-    assert len(ts_us.split()[1].split(':')[2].split('.')[0]) == 2
-    assert len(ts_us.split()[1].split(':')[2].split('.')[1]) == 6
-    assert len(ts_ms_f.split('_')) == 2
-    assert len(ts_ms_f.split('_')[0]) == 10
-    assert len(ts_ms_f.split('_')[1]) == 12
-    assert len(ts_ms_f.split('_')[0].split('-')) == 3
-    assert len(ts_ms_f.split('_')[0].split('-')[0]) == 4
-    assert len(ts_ms_f.split('_')[0].split('-')[1]) == 2
-    assert len(ts_ms_f.split('_')[0].split('-')[2]) == 2
-    assert len(ts_ms_f.split('_')[1].split('-')) == 3
-    assert len(ts_ms_f.split('_')[1].split('-')[0]) == 2
-    assert len(ts_ms_f.split('_')[1].split('-')[1]) == 2
-    assert len(ts_ms_f.split('_')[1].split('-')[2]) == 6
-    assert len(ts_ms_f.split('_')[1].split('-')[2].split('.')) == 2
-    assert len(ts_ms_f.split('_')[1].split('-')[2].split('.')[0]) == 2
-    assert len(ts_ms_f.split('_')[1].split('-')[2].split('.')[1]) == 3
+    assert pattern.fullmatch(ts)
 
 
 def test_ranID():
@@ -96,62 +46,56 @@ def test_ranID():
     for i, ran in enumerate(rans):
         assert len(ran) == int(np.ceil((i+1)/4)*4)
 
-    rans = [ranID(length=20) for _ in range(1000)]
-    for ran in rans:
-        base64_safe = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_'
-        assert np.all([c in base64_safe for c in ran])
-
-    rans = [ranID(length=20, only_alphanumeric=True) for _ in range(1000)]
-    for ran in rans:
-        alnum = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
-        assert np.all([c in alnum for c in ran])
-
-    rans = ranID(length=20, size=1000)
-    for ran in rans:
-        base64_safe = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_'
-        assert np.all([c in base64_safe for c in ran])
-
-    rans = ranID(length=20, size=1000, only_alphanumeric=True)
-    for ran in rans:
-        alnum = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
-        assert np.all([c in alnum for c in ran])
-
-
-def test_system_lock():
-    datafile = FsPath.cwd() / 'test_cronjob.txt'
-    lockfile = FsPath.cwd() / 'test_cronjob.lock'
-    if datafile.exists():
-        datafile.unlink()
-    if lockfile.exists():
-        lockfile.unlink()
-
-    # Normal run
-    cmd1 = run(['python', 'cronjob_example.py'], capture_output=True, text=True)
+    for only_alphanumeric, strip in [(False, _strip_b64), (True, _strip_alnum)]:
+        rans = ranID(length=20, size=1000, only_alphanumeric=only_alphanumeric)
+        assert len(rans) == 1000
+        assert len(set(rans)) == 1000
+        for ran in rans:
+            assert len(ran) == 20
+            assert ran.translate(strip) == ''
+
+
+def test_system_lock(tmp_path):
+    # The cronjob works in its current directory, which is a fresh one for every test
+    cronjob = str(FsPath(__file__).parent / 'cronjob_example.py')
+    datafile = FsPath(tmp_path) / 'test_cronjob.txt'
+    lockfile = FsPath(tmp_path) / 'test_cronjob.lock'
+
+    # These have to be separate processes, as system_lock exits the interpreter and
+    # relies on atexit to remove the lockfile (which should not happen on a kill).
+    # Normal run (short, as only the start and finish are checked)
+    cmd1 = run([sys.executable, cronjob, '0.1'], cwd=tmp_path, capture_output=True, text=True)
     assert cmd1.returncode == 0
     assert "Cronjob running." in cmd1.stdout
     assert "Cronjob finished." in cmd1.stdout
     assert not lockfile.exists()
     assert not datafile.exists()
 
-    # Run and kill halfway
+    # Run and kill halfway (as soon as the job is running, instead of after a fixed time)
+    proc = Popen([sys.executable, cronjob], cwd=tmp_path, stdout=PIPE, stderr=PIPE, text=True)
     try:
-        cmd2 = run(['python', 'cronjob_example.py'], timeout=2, capture_output=True, text=True)
-    except TimeoutExpired:
-        assert lockfile.exists()
-        assert datafile.exists()
-        datafile.unlink()
+        assert proc.stdout.readline().strip() == "Cronjob running."
+        deadline = time() + 10
+        while not datafile.exists():
+            assert proc.poll() is None, "Cronjob exited before writing its data file."
+            assert time() < deadline, "Cronjob did not write its data file in time."
+            sleep(0.01)
+    finally:
+        proc.kill()
+        proc.communicate()
+    assert lockfile.exists()
+    assert datafile.exists()
+    datafile.unlink()
 
     # Run while lockfile exists
-    cmd3 = run(['python', 'cronjob_example.py'], capture_output=True, text=True)
+    cmd3 = run([sys.executable, cronjob], cwd=tmp_path, capture_output=True, text=True)
     assert cmd3.returncode == 1
     assert "Cronjob running." not in cmd3.stdout
     assert "Cronjob finished." not in cmd3.stdout
     assert "Previous test_cronjob.lock script still active!" in cmd3.stderr
     assert not datafile.exists()
-    lockfile.unlink()
 
 
 def test_hash():
-    hs = get_hash('cronjob_example.py')
-    assert hs == '3eeb344d1236d3d0e2400744c732aded84528a4491600b5533052ced14b03fc5249668' \
-               + '3d2f5e71ac18f4ddf14673a4b53fb06c01c95f1a1d0ea11a485439a17b'
+    hs = get_hash(FsPath(__file__).parent / 'cronjob_example.py')
+    assert hs == _expected_hash
@@ -4,11 +4,20 @@
 # ######################################### #
 
 import os
+import sys
 import json
 import time
 import pytest
 import signal
-from multiprocessing import Pool, Process, Queue
+from pathlib import Path
+import multiprocessing
+from multiprocessing import connection
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 
 from xaux import FsPath, ProtectFile
 
@@ -16,17 +25,30 @@ from xaux import FsPath, ProtectFile
 ProtectFile._debug = True
 ProtectFile._testing = True
 
+# Forking avoids re-importing this module (and xaux) in every worker. It is only forced
+# on Linux; elsewhere (macOS, Windows) the platform default start method is kept.
+_mp_context = multiprocessing.get_context("fork" if sys.platform.startswith("linux") else None)
+
+# Generous, as a slow start-up of the jobs only delays the moment they are released together
+_barrier_timeout = 60
+
 
 def rewrite(pf, runtime=0.2):
     data = json.load(pf)
     time.sleep(runtime)
     data["myint"] += 1
-    pf.seek(0)  # revert point to beginning of file
-    json.dump(data, pf, indent=4, sort_keys=True)
+    # Serialise first, then write in one go (instead of streaming json.dump into the file)
+    payload = json.dumps(data, separators=(",", ":"))
+    pf.seek(0)
+    pf.write(payload)
     pf.truncate()
 
-def change_file_protected(fname, max_lock_time=None, error_queue=None, wait=0.1, runtime=0.2, job_id=None):
+def change_file_protected(fname, max_lock_time=None, error_pipe=None, wait=0.1, runtime=0.2, job_id=None,
+                          barrier=None):
     try:
+        if barrier is not None:
+            # All jobs contend for the lock at the same time
+            barrier.wait(timeout=_barrier_timeout)
         if job_id:
             t0 = time.time()
             print(f"Job {job_id} started  (stamp {t0})", flush=True)
@@ -42,10 +64,22 @@ def change_file_protected(fname, max_lock_time=None, error_queue=None, wait=0.1,
             t3 = time.time()
             print(f"Job {job_id} done (total duration: {int(1e3*(t3-t0))}ms, exit duration {int(1e3*(t3-t2))}ms, stamp {t2})", flush=True)
     except Exception as e:
-        if error_queue is None:
+        if error_pipe is None:
             raise e
         else:
-            error_queue.put(e)
+            error_pipe.send(e)
+    return
+
+def change_file_protected_flock(fname, runtime=0.2):
+    # Reference implementation with a blocking kernel lock, as a lower bound for ProtectFile
+    with open(fname, "r+") as pf:
+        fcntl.flock(pf, fcntl.LOCK_EX)
+        try:
+            rewrite(pf, runtime)
+            pf.flush()
+            os.fsync(pf.fileno())
+        finally:
+            fcntl.flock(pf, fcntl.LOCK_UN)
     return
 
 def change_file_standard(fname):
@@ -54,232 +88,174 @@ def change_file_standard(fname):
     return
 
 def init_file(fname):
-    # Remove leftover lockfiles
-    for f in FsPath.cwd().glob(f"{fname}.lock*"):
-        f.unlink()
-
-    # Initialise file
-    t_prev = time.time()
-    with ProtectFile(fname, "w", wait=0.1) as pf:
-        init_time = time.time() - t_prev
-        json.dump({"myint": 0}, pf, indent=4)
-        dump_time = time.time() - t_prev - init_time
-    exit_time = time.time() - t_prev - init_time - dump_time
-
-    return init_time, dump_time, exit_time  # These are the times taken by the ProtectFile process
+    # Initialise file (no concurrent access yet, so no need for protection). Every test
+    # works in its own tmp_path, so there are no leftover lockfiles to remove.
+    Path(fname).write_text(json.dumps({"myint": 0}, separators=(",", ":")))
+
+def read_myint(fname):
+    # Read-only access, as the file is only inspected
+    return json.loads(Path(fname).read_bytes())["myint"]
+
+def propagate_child_errors(error_reader):
+    # The jobs send their exception (if any) over the write end of a one-way Pipe
+    if error_reader.poll():
+        raise error_reader.recv()
+
+def join_processes(procs, error_reader):
+    # Join the jobs in the order they finish, such that an error is raised as soon as it
+    # is reported (instead of after the slowest job). The remaining jobs are then killed.
+    sentinels = {proc.sentinel: proc for proc in procs}
+    try:
+        while sentinels:
+            for sentinel in connection.wait(list(sentinels)):
+                sentinels.pop(sentinel).join()
+            propagate_child_errors(error_reader)
+    finally:
+        for proc in sentinels.values():
+            proc.kill()
+            proc.join()
+
+def wait_for(predicate, timeout, poll=0.005):
+    t0 = time.time()
+    while not predicate():
+        if time.time() - t0 > timeout:
+            raise TimeoutError(f"Condition not met within {timeout}s.")
+        time.sleep(poll)
+
+def lock_is_written(lock_file):
+    # The lockfile is created first and filled afterwards: killing a job in between would
+    # leave an empty lockfile, which the other jobs cannot parse (nor free)
+    try:
+        return 'free_after' in json.loads(lock_file.read_text())
+    except (OSError, json.JSONDecodeError):
+        return False
 
-def propagate_child_errors(error_queue):
-    while not error_queue.empty():
-        raise error_queue.get()
+def lock_is_replaced(lock_file, lock):
+    try:
+        return lock_file.read_text() != lock
+    except OSError:
+        return True
+
+def assert_stuck(fname, lock_file, runslow=False, interval=0.2):
+    # Without max_lock_time, a crashed lock is never freed (it has no expiry), so a short
+    # window spanning a few retries of the waiting jobs suffices to verify that nothing
+    # progresses: the counter is unchanged and the lockfile is still the crashed one.
+    # With --runslow, this instead watches for a bit more than a minute.
+    duration = 90 if runslow else 5.0
+    lock = lock_file.read_text()
+    t0 = time.time()
+    while time.time() - t0 < duration:
+        time.sleep(interval)
+        assert read_myint(fname) == 0
+        assert lock_file.read_text() == lock
 
-def kill_process(proc, error_queue=None):
+def kill_process(proc, error_reader=None):
     os.kill(proc.pid, signal.SIGKILL)
     proc.join()
     # Check if the process raised an error
-    if error_queue is not None:
-        propagate_child_errors(error_queue)
+    if error_reader is not None:
+        propagate_child_errors(error_reader)
 
 
 
-def test_deliberate_failure():
-    fname = "standard_file.json"
+def test_deliberate_failure(tmp_path):
+    fname = str(tmp_path / "standard_file.json")
     init_file(fname)
 
+    # Threads suffice to expose the race (the GIL is released during I/O and sleep)
     workers = 4
-    with Pool(processes=workers) as pool:
-        pool.map(change_file_standard, [fname] * 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(change_file_standard, [fname] * workers))
 
-    with open(fname, "r+") as pf:
-        data = json.load(pf)
-        assert data["myint"] != workers  # assert that result is wrong
+    assert read_myint(fname) != workers  # assert that result is wrong
 
-    FsPath(fname).unlink()
 
+# These have to be processes, to test the intended cross-process behaviour. The pool is
+# shared between all parametrizations of test_protection, as starting it dominates.
+@pytest.fixture(scope="module")
+def worker_pool():
+    with _mp_context.Pool(processes=100) as pool:
+        yield pool
 
+# The tests that start many processes are kept on one worker under pytest-xdist
+# (with --dist loadgroup), to avoid several process storms on the same cores
+@pytest.mark.xdist_group("heavy_procs")
+@pytest.mark.parametrize("change_file", [change_file_protected, change_file_protected_flock],
+                         ids=["protectfile", "flock"])
 @pytest.mark.parametrize("workers", [4, 100])
-def test_protection(workers):
-    fname = "protected_file.json"
+def test_protection(tmp_path, worker_pool, workers, change_file):
+    if change_file is change_file_protected_flock and fcntl is None:
+        pytest.skip("fcntl is not available on this system.")
+    fname = str(tmp_path / "protected_file.json")
     init_file(fname)
 
-    with Pool(processes=workers) as pool:
-        pool.map(change_file_protected, [(fname)] * workers)
-
-    with open(fname, "r+") as pf:
-        data = json.load(pf)
-        assert data["myint"] == workers
-
-    FsPath(fname).unlink()
-
-
-# TODO: on some systems, multiprocessing can take considerable time to start up (then the test will fail)
-
-def test_normal_wait():
-    fname = "test_normal_wait.json"
-    lock_file = f"{fname}.lock"
-    sys_init_time, sys_dump_time, sys_exit_time = init_file(fname)
-    print(f"ProtectFile takes ~{1e3*sys_init_time}ms, ~{1e3*sys_dump_time}ms, "
-        + f"~{1e3*sys_exit_time}ms on this system")
-
-    t0 = time.time()
-    n_concurrent = 20
-
-    error_queue = Queue()
-    procs = [
-        # args: name, max_lock_time, error_queue, wait, runtime, job_id
-        Process(target=change_file_protected, args=(fname, None, error_queue, 2, 1.5, i))
-        for i in range(n_concurrent)
-    ]
-
-    for proc in procs:
-        proc.start()
-        time.sleep(0.001)
-
-    for proc in procs:
-        proc.join()
-
-    propagate_child_errors(error_queue)
-
-    with open(fname, "r+") as pf:
-        data = json.load(pf)
-        assert data["myint"] == n_concurrent
-    assert not FsPath(lock_file).exists()
-
-    print(f"Total time for {n_concurrent} concurrent jobs: {time.time() - t0:.2f}s")
-
-    FsPath(fname).unlink()
-
-
-def test_normal_crashed():
-    fname = "test_normal_wait.json"
-    lock_file = f"{fname}.lock"
-    sys_init_time, sys_dump_time, sys_exit_time = init_file(fname)
-    print(f"ProtectFile takes ~{1e3*sys_init_time}ms, ~{1e3*sys_dump_time}ms, "
-        + f"~{1e3*sys_exit_time}ms on this system")
-
-    t0 = time.time()
-    n_concurrent = 20
-
-    error_queue = Queue()
-    procs = [
-        # args: name, max_lock_time, error_queue, wait, runtime, job_id
-        Process(target=change_file_protected, args=(fname, None, error_queue, 2, 1.5, i))
-        for i in range(n_concurrent)
-    ]
-
-    for i, proc in enumerate(procs):
-        proc.start()
-        time.sleep(0.001)
-        if i == 0:
-            # This timing is very sensitive to the system; on some systems the process is almost finished
-            # after this time while on others it did not even start yet...
-            time.sleep(1.25)
-            kill_process(proc, error_queue)
-            with open(fname, "r") as pf:
-                data = json.load(pf)
-                assert data["myint"] == 0
-            assert FsPath(lock_file).exists()
-
-    # After a bit more than a minute, the situation should not have changed
-    time.sleep(90)
-    with open(fname, "r+") as pf:
-        data = json.load(pf)
-        assert data["myint"] == 0
-    assert FsPath(lock_file).exists()
-
-    # So we manually remove the lockfile, and the situation should resolve itself
-    FsPath(lock_file).unlink()
-    for proc in procs:
-        proc.join()
-
-    propagate_child_errors(error_queue)
-
-    with open(fname, "r+") as pf:
-        data = json.load(pf)
-        assert data["myint"] == n_concurrent - 1
-    assert not FsPath(lock_file).exists()
-
-    print(f"Total time for {n_concurrent} concurrent jobs: {time.time() - t0:.2f}s")
-
-    FsPath(fname).unlink()
-
-
-def test_max_lock_time_wait():
-    fname = "test_max_lock_time_wait.json"
-    lock_file = f"{fname}.lock"
-    sys_init_time, sys_dump_time, sys_exit_time = init_file(fname)
-    print(f"ProtectFile takes ~{1e3*sys_init_time}ms, ~{1e3*sys_dump_time}ms, "
-        + f"~{1e3*sys_exit_time}ms on this system")
+    # The jobs only need to overlap, not to run long: contention comes from their number
+    worker_pool.map(partial(change_file, runtime=0.01), [(fname)] * workers)
+
+    assert read_myint(fname) == workers
+
+
+# The crashed lock with max_lock_time=90 needs a bit more than that to be freed, so by
+# default it is covered by a short max_lock_time instead (long enough for a running job)
+@pytest.mark.xdist_group("heavy_procs")
+@pytest.mark.parametrize("max_lock_time, crashed", [
+        pytest.param(None, False, id="normal-wait"),
+        pytest.param(90,   False, id="max_lock_time-wait"),
+        pytest.param(None, True,  id="normal-crashed"),
+        pytest.param(5,    True,  id="short_max_lock_time-crashed"),
+        pytest.param(90,   True,  id="max_lock_time-crashed", marks=pytest.mark.slow),
+    ])
+def test_concurrent_jobs(tmp_path, request, max_lock_time, crashed):
+    fname = str(tmp_path / "protected_file.json")
+    lock_file = FsPath(f"{fname}.lock")
+    init_file(fname)
 
     t0 = time.time()
     n_concurrent = 20
 
-    error_queue = Queue()
+    error_reader, error_pipe = _mp_context.Pipe(duplex=False)
+    # When crashing, the first job is started (and killed) before the others
+    n_contending = n_concurrent - 1 if crashed else n_concurrent
+    barrier = _mp_context.Barrier(n_contending + 1)
     procs = [
-        # args: name, max_lock_time, error_queue, wait, runtime, job_id
-        Process(target=change_file_protected, args=(fname, 90, error_queue, 2, 1.5, i))
+        # args: name, max_lock_time, error_pipe, wait, runtime, job_id, barrier
+        _mp_context.Process(target=change_file_protected,
+                            args=(fname, max_lock_time, error_pipe, 2, 1.5, i,
+                                  None if crashed and i == 0 else barrier))
         for i in range(n_concurrent)
     ]
 
-    for proc in procs:
+    if crashed:
+        # Kill the first job as soon as it holds the lock (it then still has to run for 1.5s),
+        # instead of after a fixed time, which is very sensitive to the system
+        procs[0].start()
+        wait_for(lambda: lock_is_written(lock_file), timeout=10)
+        kill_process(procs[0], error_reader)
+        assert read_myint(fname) == 0
+        crashed_lock = lock_file.read_text()
+
+    # All (other) jobs contend for the lock at the same time
+    for proc in procs[-n_contending:]:
         proc.start()
-        time.sleep(0.001)
-
-    for proc in procs:
-        proc.join()
-
-    propagate_child_errors(error_queue)
-
-    with open(fname, "r+") as pf:
-        data = json.load(pf)
-        assert data["myint"] == n_concurrent
-    assert not FsPath(lock_file).exists()
-
-    print(f"Total time for {n_concurrent} concurrent jobs: {time.time() - t0:.2f}s")
-
-    FsPath(fname).unlink()
-
+    barrier.wait(timeout=_barrier_timeout)
 
-def test_max_lock_time_crashed():
-    fname = "test_max_lock_time_wait.json"
-    lock_file = f"{fname}.lock"
-    sys_init_time, sys_dump_time, sys_exit_time = init_file(fname)
-    print(f"ProtectFile takes ~{1e3*sys_init_time}ms, ~{1e3*sys_dump_time}ms, "
-        + f"~{1e3*sys_exit_time}ms on this system")
+    if crashed and max_lock_time is None:
+        # The situation should not change by itself
+        assert_stuck(fname, lock_file, runslow=request.config.getoption("--runslow"))
 
-    t0 = time.time()
-    n_concurrent = 20
+        # So we manually remove the lockfile, and the situation should resolve itself
+        lock_file.unlink()
 
-    error_queue = Queue()
-    procs = [
-        # args: name, max_lock_time, error_queue, wait, runtime, job_id
-        Process(target=change_file_protected, args=(fname, 90, error_queue, 2, 1.5, i))
-        for i in range(n_concurrent)
-    ]
+    elif crashed:
+        # With a max_lock_time, the situation resolves itself once the crashed lock
+        # expires (and not before)
+        free_after = int(json.loads(crashed_lock)["free_after"])
+        wait_for(lambda: lock_is_replaced(lock_file, crashed_lock), timeout=max_lock_time + 10, poll=0.05)
+        assert time.time() > free_after
 
-    for i, proc in enumerate(procs):
-        proc.start()
-        time.sleep(0.001)
-        if i == 0:
-            # This timing is very sensitive to the system; on some systems the process is almost finished
-            # after this time while on others it did not even start yet...
-            time.sleep(1.25)
-            kill_process(proc, error_queue)
-            with open(fname, "r") as pf:
-                data = json.load(pf)
-                assert data["myint"] == 0
-            assert FsPath(lock_file).exists()
-
-    # The situation should now resolve itself as there is a max_lock_time
-    for proc in procs:
-        proc.join()
-
-    with open(fname, "r+") as pf:
-        data = json.load(pf)
-        assert data["myint"] == n_concurrent - 1
-    assert not FsPath(lock_file).exists()
+    join_processes(procs, error_reader)
 
-    propagate_child_errors(error_queue)
+    assert read_myint(fname) == n_contending
+    assert not lock_file.exists()
 
     print(f"Total time for {n_concurrent} concurrent jobs: {time.time() - t0:.2f}s")
-
-    FsPath(fname).unlink()
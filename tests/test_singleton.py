@@ -12,7 +12,22 @@ from xaux import singleton
 # We are overly verbose in these tests, comparing every time again all instances to each other.
 # This is to make sure that the singletons are really singletons and that they do not interfere
 # with each other. It's an important overhead to ensure we deeply test the global states, because
-# if we would pytest.parametrize this, we might be copying state and not realising this.
+# if we would pytest.parametrize this, we might be copying state and not realising this. The only
+# exception is where the classes themselves are created inside the test body, as then each
+# parametrisation gets its own fresh classes.
+# Where many instances have to differ from many others, all pairs are compared in one go.
+
+
+# Only for checking that an instance exists: this looks at the class itself, not at an instance
+# inherited from a (singleton) parent. Checks after delete() use hasattr instead, as does the
+# singleton decorator itself, such that an instance still reachable via the MRO is caught.
+def _has_inst(cls):
+    return '_singleton_instance' in cls.__dict__
+
+
+def _all_distinct(instances, others):
+    # No instance is the same object as any of the others
+    return set(map(id, instances)).isdisjoint(map(id, others))
 
 
 def test_singleton():
@@ -40,7 +55,7 @@ def test_singleton():
     # Initialise with default value
     assert not hasattr(SingletonClass1, '_singleton_instance')
     instance1 = SingletonClass1()
-    assert hasattr(SingletonClass1, '_singleton_instance')
+    assert _has_inst(SingletonClass1)
     assert instance1.value == 3
 
     # Initialise with specific value
@@ -79,7 +94,7 @@ def test_singleton():
 
     # First initialisation with specific value
     instance4 = SingletonClass1(value=8)
-    assert hasattr(SingletonClass1, '_singleton_instance')
+    assert _has_inst(SingletonClass1)
     assert instance4.value == 8
     assert instance1 is not instance4
     assert instance2 is not instance4
@@ -147,46 +162,28 @@ def test_nonsingleton_inheritance():
     assert child1_instance1.value2 == -78
 
     # Test the other singleton child class
+    ns_parent_instances = [ns_parent_instance1, ns_parent_instance2]
+    child1_instances = [child1_instance1, child1_instance2, child1_instance3, child1_instance4]
     child2_instance1 = SingletonChild2()
-    assert child2_instance1 is not ns_parent_instance1
-    assert child2_instance1 is not ns_parent_instance2
-    assert child2_instance1 is not child1_instance1
-    assert child2_instance1 is not child1_instance2
-    assert child2_instance1 is not child1_instance3
-    assert child2_instance1 is not child1_instance4
+    assert _all_distinct([child2_instance1], ns_parent_instances + child1_instances)
     assert child2_instance1.value1 == 3
     assert child2_instance1.value2 == -13
     child2_instance2 = SingletonChild2(value1=-4)
     assert child2_instance2 is child2_instance1
-    assert child2_instance2 is not ns_parent_instance1
-    assert child2_instance2 is not ns_parent_instance2
-    assert child2_instance2 is not child1_instance1
-    assert child2_instance2 is not child1_instance2
-    assert child2_instance2 is not child1_instance3
-    assert child2_instance2 is not child1_instance4
+    assert _all_distinct([child2_instance2], ns_parent_instances + child1_instances)
     assert child2_instance1.value1 == -4
     assert child2_instance1.value2 == -13
     child2_instance3 = SingletonChild2(value2=-9)
     assert child2_instance3 is child2_instance1
     assert child2_instance3 is child2_instance2
-    assert child2_instance3 is not ns_parent_instance1
-    assert child2_instance3 is not ns_parent_instance2
-    assert child2_instance3 is not child1_instance1
-    assert child2_instance3 is not child1_instance2
-    assert child2_instance3 is not child1_instance3
-    assert child2_instance3 is not child1_instance4
+    assert _all_distinct([child2_instance3], ns_parent_instances + child1_instances)
     assert child2_instance1.value1 == -4
     assert child2_instance1.value2 == -9
     child2_instance4 = SingletonChild2(value1=127, value2=99)
     assert child2_instance4 is child2_instance1
     assert child2_instance4 is child2_instance2
     assert child2_instance4 is child2_instance3
-    assert child2_instance4 is not ns_parent_instance1
-    assert child2_instance4 is not ns_parent_instance2
-    assert child2_instance4 is not child1_instance1
-    assert child2_instance4 is not child1_instance2
-    assert child2_instance4 is not child1_instance3
-    assert child2_instance4 is not child1_instance4
+    assert _all_distinct([child2_instance4], ns_parent_instances + child1_instances)
     assert child2_instance1.value1 == 127
     assert child2_instance1.value2 == 99
 
@@ -194,30 +191,10 @@ def test_nonsingleton_inheritance():
     ns_parent_instance3 = NonSingletonParent(value1=23)
     assert ns_parent_instance1 is not ns_parent_instance2
     assert ns_parent_instance3 is not ns_parent_instance1
+    ns_parent_instances = [ns_parent_instance1, ns_parent_instance2, ns_parent_instance3]
+    child2_instances = [child2_instance1, child2_instance2, child2_instance3, child2_instance4]
     assert child1_instance1 is not ns_parent_instance1
-    assert child1_instance2 is not ns_parent_instance1
-    assert child1_instance3 is not ns_parent_instance1
-    assert child1_instance4 is not ns_parent_instance1
-    assert child1_instance1 is not ns_parent_instance2
-    assert child1_instance2 is not ns_parent_instance2
-    assert child1_instance3 is not ns_parent_instance2
-    assert child1_instance4 is not ns_parent_instance2
-    assert child1_instance1 is not ns_parent_instance3
-    assert child1_instance2 is not ns_parent_instance3
-    assert child1_instance3 is not ns_parent_instance3
-    assert child1_instance4 is not ns_parent_instance3
-    assert child2_instance1 is not ns_parent_instance1
-    assert child2_instance2 is not ns_parent_instance1
-    assert child2_instance3 is not ns_parent_instance1
-    assert child2_instance4 is not ns_parent_instance1
-    assert child2_instance1 is not ns_parent_instance2
-    assert child2_instance2 is not ns_parent_instance2
-    assert child2_instance3 is not ns_parent_instance2
-    assert child2_instance4 is not ns_parent_instance2
-    assert child2_instance1 is not ns_parent_instance3
-    assert child2_instance2 is not ns_parent_instance3
-    assert child2_instance3 is not ns_parent_instance3
-    assert child2_instance4 is not ns_parent_instance3
+    assert _all_distinct(child1_instances + child2_instances, ns_parent_instances)
     assert ns_parent_instance1.value1 == 8
     assert ns_parent_instance2.value1 == 9
     assert ns_parent_instance3.value1 == 23
@@ -233,19 +210,25 @@ def test_nonsingleton_inheritance():
     assert not hasattr(SingletonChild2, '_singleton_instance')
 
 
-def test_singleton_inheritance():
+# The classes are created inside the test body, so every parametrisation starts from fresh
+# classes and no singleton state is carried over from the previous one.
+@pytest.mark.parametrize("child_decorator", [lambda cls: cls, singleton],
+                         ids=["plain_children", "singleton_children"])
+def test_singleton_inheritance(child_decorator):
     @singleton
     class SingletonParent1:
         def __init__(self, value1=7):
             print("In SingletonParent1 __init__")
             self.value1 = value1
 
+    @child_decorator
     class SingletonChild3(SingletonParent1):
         def __init__(self, *args, value2='lop', **kwargs):
             print("In SingletonChild3 __init__")
             self.value2 = value2
             super().__init__(*args, **kwargs)
 
+    @child_decorator
     class SingletonChild4(SingletonParent1):
         def __init__(self, *args, value2=0, **kwargs):
             print("In SingletonChild4 __init__")
@@ -289,89 +272,44 @@ def test_singleton_inheritance():
     assert child3_instance1.value2 == 'josepHArt'
 
     # Test the other singleton child class
+    parent1_instances = [parent1_instance1, parent1_instance2]
+    child3_instances = [child3_instance1, child3_instance2, child3_instance3, child3_instance4]
     child4_instance1 = SingletonChild4()
-    assert child4_instance1 is not parent1_instance1
-    assert child4_instance1 is not parent1_instance2
-    assert child4_instance1 is not child3_instance1
-    assert child4_instance1 is not child3_instance2
-    assert child4_instance1 is not child3_instance3
-    assert child4_instance1 is not child3_instance4
+    assert _all_distinct([child4_instance1], parent1_instances + child3_instances)
     # The parent values are INHERITED, but not SYNCED
     assert child4_instance1.value1 == 7
     assert child4_instance1.value2 == 0
     child4_instance2 = SingletonChild4(value1=0.11)
     assert child4_instance2 is child4_instance1
-    assert child4_instance2 is not parent1_instance1
-    assert child4_instance2 is not parent1_instance2
-    assert child4_instance2 is not child3_instance1
-    assert child4_instance2 is not child3_instance2
-    assert child4_instance2 is not child3_instance3
-    assert child4_instance2 is not child3_instance4
+    assert _all_distinct([child4_instance2], parent1_instances + child3_instances)
     assert child4_instance1.value1 == 0.11
     assert child4_instance1.value2 == 0
     child4_instance3 = SingletonChild4(value2=6)
     assert child4_instance3 is child4_instance1
     assert child4_instance3 is child4_instance2
-    assert child4_instance3 is not parent1_instance1
-    assert child4_instance3 is not parent1_instance2
-    assert child4_instance3 is not child3_instance1
-    assert child4_instance3 is not child3_instance2
-    assert child4_instance3 is not child3_instance3
-    assert child4_instance3 is not child3_instance4
+    assert _all_distinct([child4_instance3], parent1_instances + child3_instances)
     assert child4_instance1.value1 == 0.11
     assert child4_instance1.value2 == 6
     child4_instance4 = SingletonChild4(value1='hoho', value2=22)
     assert child4_instance4 is child4_instance1
     assert child4_instance4 is child4_instance2
     assert child4_instance4 is child4_instance3
-    assert child4_instance4 is not parent1_instance1
-    assert child4_instance4 is not parent1_instance2
-    assert child4_instance4 is not child3_instance1
-    assert child4_instance4 is not child3_instance2
-    assert child4_instance4 is not child3_instance3
-    assert child4_instance4 is not child3_instance4
+    assert _all_distinct([child4_instance4], parent1_instances + child3_instances)
     assert child4_instance1.value1 == 'hoho'
     assert child4_instance1.value2 == 22
 
     # Assert the (singleton) parent is not influenced by the children
     assert parent1_instance2 is parent1_instance1
+    child4_instances = [child4_instance1, child4_instance2, child4_instance3, child4_instance4]
     assert child3_instance1 is not parent1_instance1
-    assert child3_instance2 is not parent1_instance1
-    assert child3_instance3 is not parent1_instance1
-    assert child3_instance4 is not parent1_instance1
-    assert child3_instance1 is not parent1_instance2
-    assert child3_instance2 is not parent1_instance2
-    assert child3_instance3 is not parent1_instance2
-    assert child3_instance4 is not parent1_instance2
-    assert child4_instance1 is not parent1_instance1
-    assert child4_instance2 is not parent1_instance1
-    assert child4_instance3 is not parent1_instance1
-    assert child4_instance4 is not parent1_instance1
-    assert child4_instance1 is not parent1_instance2
-    assert child4_instance2 is not parent1_instance2
-    assert child4_instance3 is not parent1_instance2
-    assert child4_instance4 is not parent1_instance2
+    assert _all_distinct(child3_instances + child4_instances, parent1_instances)
     assert parent1_instance1.value1 == 9
     assert parent1_instance2.value1 == 9
     parent1_instance3 = SingletonParent1(value1=23)
     assert parent1_instance2 is parent1_instance1
     assert parent1_instance3 is parent1_instance2
     assert child3_instance1 is not parent1_instance1
-    assert child3_instance2 is not parent1_instance1
-    assert child3_instance3 is not parent1_instance1
-    assert child3_instance4 is not parent1_instance1
-    assert child3_instance1 is not parent1_instance2
-    assert child3_instance2 is not parent1_instance2
-    assert child3_instance3 is not parent1_instance2
-    assert child3_instance4 is not parent1_instance2
-    assert child4_instance1 is not parent1_instance1
-    assert child4_instance2 is not parent1_instance1
-    assert child4_instance3 is not parent1_instance1
-    assert child4_instance4 is not parent1_instance1
-    assert child4_instance1 is not parent1_instance2
-    assert child4_instance2 is not parent1_instance2
-    assert child4_instance3 is not parent1_instance2
-    assert child4_instance4 is not parent1_instance2
+    assert _all_distinct(child3_instances + child4_instances, parent1_instances)
     assert parent1_instance1.value1 == 23
     assert parent1_instance2.value1 == 23
     assert parent1_instance3.value1 == 23
@@ -410,39 +348,28 @@ def test_singleton_inheritance():
     assert child3_instance5.value2 == 'josepHArt'
 
     # Test the other singleton child class without parent
+    child3_instances = [child3_instance5, child3_instance6, child3_instance7, child3_instance8]
     child4_instance5 = SingletonChild4()
-    assert child4_instance5 is not child3_instance5
-    assert child4_instance5 is not child3_instance6
-    assert child4_instance5 is not child3_instance7
-    assert child4_instance5 is not child3_instance8
+    assert _all_distinct([child4_instance5], child3_instances)
     # The parent values are INHERITED, but not SYNCED
     assert child4_instance5.value1 == 7
     assert child4_instance5.value2 == 0
     child4_instance6 = SingletonChild4(value1=0.11)
     assert child4_instance6 is child4_instance5
-    assert child4_instance6 is not child3_instance5
-    assert child4_instance6 is not child3_instance6
-    assert child4_instance6 is not child3_instance7
-    assert child4_instance6 is not child3_instance8
+    assert _all_distinct([child4_instance6], child3_instances)
     assert child4_instance5.value1 == 0.11
     assert child4_instance5.value2 == 0
     child4_instance7 = SingletonChild4(value2=6)
     assert child4_instance7 is child4_instance5
     assert child4_instance7 is child4_instance6
-    assert child4_instance7 is not child3_instance5
-    assert child4_instance7 is not child3_instance6
-    assert child4_instance7 is not child3_instance7
-    assert child4_instance7 is not child3_instance8
+    assert _all_distinct([child4_instance7], child3_instances)
     assert child4_instance5.value1 == 0.11
     assert child4_instance5.value2 == 6
     child4_instance8 = SingletonChild4(value1='hoho', value2=22)
     assert child4_instance8 is child4_instance5
     assert child4_instance8 is child4_instance6
     assert child4_instance8 is child4_instance7
-    assert child4_instance8 is not child3_instance5
-    assert child4_instance8 is not child3_instance6
-    assert child4_instance8 is not child3_instance7
-    assert child4_instance8 is not child3_instance8
+    assert _all_distinct([child4_instance8], child3_instances)
     assert child4_instance5.value1 == 'hoho'
     assert child4_instance5.value2 == 22
 
@@ -453,229 +380,6 @@ def test_singleton_inheritance():
     assert not hasattr(SingletonChild4, '_singleton_instance')
 
 
-# This is the same test as above, but with the singleton decorator applied to parent and child
-def test_double_singleton_inheritance():
-    @singleton
-    class SingletonParent2:
-        def __init__(self, value1=7):
-            print("In SingletonParent2 __init__")
-            self.value1 = value1
-
-    @singleton
-    class SingletonChild5(SingletonParent2):
-        def __init__(self, *args, value2='lop', **kwargs):
-            print("In SingletonChild5 __init__")
-            self.value2 = value2
-            super().__init__(*args, **kwargs)
-
-    @singleton
-    class SingletonChild6(SingletonParent2):
-        def __init__(self, *args, value2=0, **kwargs):
-            print("In SingletonChild6 __init__")
-            self.value2 = value2
-            super().__init__(*args, **kwargs)
-
-    # Test the singleton parent class
-    parent2_instance1 = SingletonParent2(value1=8)
-    assert parent2_instance1.value1 == 8
-    parent2_instance2 = SingletonParent2(value1=9)
-    assert parent2_instance1 is parent2_instance2
-    assert parent2_instance1.value1 == 9
-    assert parent2_instance2.value1 == 9
-
-    # Test the singleton child class
-    child5_instance1 = SingletonChild5()
-    assert child5_instance1 is not parent2_instance1
-    assert child5_instance1 is not parent2_instance2
-    # The parent values are INHERITED, but not SYNCED
-    assert child5_instance1.value1 == 7
-    assert child5_instance1.value2 == 'lop'
-    child5_instance2 = SingletonChild5(value1=-2)
-    assert child5_instance2 is child5_instance1
-    assert child5_instance2 is not parent2_instance1
-    assert child5_instance2 is not parent2_instance2
-    assert child5_instance1.value1 == -2
-    assert child5_instance1.value2 == 'lop'
-    child5_instance3 = SingletonChild5(value2=4.345)
-    assert child5_instance3 is child5_instance1
-    assert child5_instance3 is child5_instance2
-    assert child5_instance3 is not parent2_instance1
-    assert child5_instance3 is not parent2_instance2
-    assert child5_instance1.value1 == -2
-    assert child5_instance1.value2 == 4.345
-    child5_instance4 = SingletonChild5(value1='jej', value2='josepHArt')
-    assert child5_instance4 is child5_instance1
-    assert child5_instance4 is child5_instance2
-    assert child5_instance4 is child5_instance3
-    assert child5_instance4 is not parent2_instance1
-    assert child5_instance1.value1 == 'jej'
-    assert child5_instance1.value2 == 'josepHArt'
-
-    # Test the other singleton child class
-    child6_instance1 = SingletonChild6()
-    assert child6_instance1 is not parent2_instance1
-    assert child6_instance1 is not parent2_instance2
-    assert child6_instance1 is not child5_instance1
-    assert child6_instance1 is not child5_instance2
-    assert child6_instance1 is not child5_instance3
-    assert child6_instance1 is not child5_instance4
-    # The parent values are INHERITED, but not SYNCED
-    assert child6_instance1.value1 == 7
-    assert child6_instance1.value2 == 0
-    child6_instance2 = SingletonChild6(value1=0.11)
-    assert child6_instance2 is child6_instance1
-    assert child6_instance2 is not parent2_instance1
-    assert child6_instance2 is not parent2_instance2
-    assert child6_instance2 is not child5_instance1
-    assert child6_instance2 is not child5_instance2
-    assert child6_instance2 is not child5_instance3
-    assert child6_instance2 is not child5_instance4
-    assert child6_instance1.value1 == 0.11
-    assert child6_instance1.value2 == 0
-    child6_instance3 = SingletonChild6(value2=6)
-    assert child6_instance3 is child6_instance1
-    assert child6_instance3 is child6_instance2
-    assert child6_instance3 is not parent2_instance1
-    assert child6_instance3 is not parent2_instance2
-    assert child6_instance3 is not child5_instance1
-    assert child6_instance3 is not child5_instance2
-    assert child6_instance3 is not child5_instance3
-    assert child6_instance3 is not child5_instance4
-    assert child6_instance1.value1 == 0.11
-    assert child6_instance1.value2 == 6
-    child6_instance4 = SingletonChild6(value1='hoho', value2=22)
-    assert child6_instance4 is child6_instance1
-    assert child6_instance4 is child6_instance2
-    assert child6_instance4 is child6_instance3
-    assert child6_instance4 is not parent2_instance1
-    assert child6_instance4 is not parent2_instance2
-    assert child6_instance4 is not child5_instance1
-    assert child6_instance4 is not child5_instance2
-    assert child6_instance4 is not child5_instance3
-    assert child6_instance4 is not child5_instance4
-    assert child6_instance1.value1 == 'hoho'
-    assert child6_instance1.value2 == 22
-
-    # Assert the (singleton) parent is not influenced by the children
-    assert parent2_instance2 is parent2_instance1
-    assert child5_instance1 is not parent2_instance1
-    assert child5_instance2 is not parent2_instance1
-    assert child5_instance3 is not parent2_instance1
-    assert child5_instance4 is not parent2_instance1
-    assert child5_instance1 is not parent2_instance2
-    assert child5_instance2 is not parent2_instance2
-    assert child5_instance3 is not parent2_instance2
-    assert child5_instance4 is not parent2_instance2
-    assert child6_instance1 is not parent2_instance1
-    assert child6_instance2 is not parent2_instance1
-    assert child6_instance3 is not parent2_instance1
-    assert child6_instance4 is not parent2_instance1
-    assert child6_instance1 is not parent2_instance2
-    assert child6_instance2 is not parent2_instance2
-    assert child6_instance3 is not parent2_instance2
-    assert child6_instance4 is not parent2_instance2
-    assert parent2_instance1.value1 == 9
-    assert parent2_instance2.value1 == 9
-    parent2_instance3 = SingletonParent2(value1=23)
-    assert parent2_instance2 is parent2_instance1
-    assert parent2_instance3 is parent2_instance2
-    assert child5_instance1 is not parent2_instance1
-    assert child5_instance2 is not parent2_instance1
-    assert child5_instance3 is not parent2_instance1
-    assert child5_instance4 is not parent2_instance1
-    assert child5_instance1 is not parent2_instance2
-    assert child5_instance2 is not parent2_instance2
-    assert child5_instance3 is not parent2_instance2
-    assert child5_instance4 is not parent2_instance2
-    assert child6_instance1 is not parent2_instance1
-    assert child6_instance2 is not parent2_instance1
-    assert child6_instance3 is not parent2_instance1
-    assert child6_instance4 is not parent2_instance1
-    assert child6_instance1 is not parent2_instance2
-    assert child6_instance2 is not parent2_instance2
-    assert child6_instance3 is not parent2_instance2
-    assert child6_instance4 is not parent2_instance2
-    assert parent2_instance1.value1 == 23
-    assert parent2_instance2.value1 == 23
-    assert parent2_instance3.value1 == 23
-    assert child5_instance1.value1 == 'jej'
-    assert child5_instance1.value2 == 'josepHArt'
-    assert child6_instance1.value1 == 'hoho'
-    assert child6_instance1.value2 == 22
-
-    # Now delete all and start fresh, to ensure children can instantiate without parent existing.
-    SingletonParent2.delete()
-    assert not hasattr(SingletonParent2, '_singleton_instance')
-    SingletonChild5.delete()
-    assert not hasattr(SingletonChild5, '_singleton_instance')
-    SingletonChild6.delete()
-    assert not hasattr(SingletonChild6, '_singleton_instance')
-
-    # Test the singleton child class without parent
-    child5_instance5 = SingletonChild5()
-    # The parent values are INHERITED, but not SYNCED
-    assert child5_instance5.value1 == 7
-    assert child5_instance5.value2 == 'lop'
-    child5_instance6 = SingletonChild5(value1=-2)
-    assert child5_instance6 is child5_instance5
-    assert child5_instance5.value1 == -2
-    assert child5_instance5.value2 == 'lop'
-    child5_instance7 = SingletonChild5(value2=4.345)
-    assert child5_instance7 is child5_instance5
-    assert child5_instance7 is child5_instance6
-    assert child5_instance5.value1 == -2
-    assert child5_instance5.value2 == 4.345
-    child5_instance8 = SingletonChild5(value1='jej', value2='josepHArt')
-    assert child5_instance8 is child5_instance5
-    assert child5_instance8 is child5_instance6
-    assert child5_instance8 is child5_instance7
-    assert child5_instance5.value1 == 'jej'
-    assert child5_instance5.value2 == 'josepHArt'
-
-    # Test the other singleton child class without parent
-    child6_instance5 = SingletonChild6()
-    assert child6_instance5 is not child5_instance5
-    assert child6_instance5 is not child5_instance6
-    assert child6_instance5 is not child5_instance7
-    assert child6_instance5 is not child5_instance8
-    # The parent values are INHERITED, but not SYNCED
-    assert child6_instance5.value1 == 7
-    assert child6_instance5.value2 == 0
-    child6_instance6 = SingletonChild6(value1=0.11)
-    assert child6_instance6 is child6_instance5
-    assert child6_instance6 is not child5_instance5
-    assert child6_instance6 is not child5_instance6
-    assert child6_instance6 is not child5_instance7
-    assert child6_instance6 is not child5_instance8
-    assert child6_instance5.value1 == 0.11
-    assert child6_instance5.value2 == 0
-    child6_instance7 = SingletonChild6(value2=6)
-    assert child6_instance7 is child6_instance5
-    assert child6_instance7 is child6_instance6
-    assert child6_instance7 is not child5_instance5
-    assert child6_instance7 is not child5_instance6
-    assert child6_instance7 is not child5_instance7
-    assert child6_instance7 is not child5_instance8
-    assert child6_instance5.value1 == 0.11
-    assert child6_instance5.value2 == 6
-    child6_instance8 = SingletonChild6(value1='hoho', value2=22)
-    assert child6_instance8 is child6_instance5
-    assert child6_instance8 is child6_instance6
-    assert child6_instance8 is child6_instance7
-    assert child6_instance8 is not child5_instance5
-    assert child6_instance8 is not child5_instance6
-    assert child6_instance8 is not child5_instance7
-    assert child6_instance8 is not child5_instance8
-    assert child6_instance5.value1 == 'hoho'
-    assert child6_instance5.value2 == 22
-
-    # Clean up
-    SingletonChild5.delete()
-    assert not hasattr(SingletonChild5, '_singleton_instance')
-    SingletonChild6.delete()
-    assert not hasattr(SingletonChild6, '_singleton_instance')
-
-
 def test_singleton_grand_inheritance():
     @singleton
     class SingletonParent3:
@@ -12,6 +12,7 @@ from .fs_methods import _xrdcp_installed
 
 
 _afs_path = Path('/afs')
+_afs_prefix = _afs_path.as_posix()
 
 try:
     cmd = run(['fs', '--version'], stdout=PIPE, stderr=PIPE)
@@ -42,11 +43,9 @@ def _on_afs(*args):
     #     and (args[1].startswith('afs/') or \
     #         (args[1] == 'afs' and len(args) > 2)):
     #         return True
-    absolute = _non_strict_resolve(Path(*args).expanduser().absolute().parent)
-    if absolute == _afs_path:
-        return True
-    parents = list(absolute.parents)
-    return len(parents) > 1 and parents[-2] == _afs_path
+    absolute = _non_strict_resolve(Path(*args).expanduser().absolute().parent, _as_posix=True)
+    # The path is resolved, so a plain string comparison of the first component suffices
+    return absolute == _afs_prefix or absolute.startswith(f"{_afs_prefix}/")
 
 
 class AfsPath(FsPath, Path):
@@ -7,10 +7,12 @@ import os, sys
 from pathlib import Path, PurePosixPath, PureWindowsPath
 
 from .fs import FsPath, _non_strict_resolve
-from .eos_methods import _eos_path, _eos_exists, _eos_stat, _eos_lstat, _eos_is_file, \
+from .eos_methods import _eos_path, _eos_exists, _eos_lexists, _eos_stat, _eos_lstat, _eos_is_file, \
                          _eos_is_dir, _eos_is_symlink, _eos_touch, _eos_symlink_to, \
                          _eos_unlink, _eos_mkdir, _eos_rmdir, _eos_rmtree, _eos_size
 
+_eos_prefix = _eos_path.as_posix()
+
 # Note: /eos itself is not on EOS (it is a mountpoint on the local disk)
 def _on_eos(*args):
     if isinstance(args[0], str):
@@ -25,11 +27,9 @@ def _on_eos(*args):
     #     and (args[1].startswith('eos/') or \
     #         (args[1] == 'eos' and len(args) > 2)):
     #         return True
-    absolute = _non_strict_resolve(Path(*args).expanduser().absolute().parent)
-    if absolute == _eos_path:
-        return True
-    parents = list(absolute.parents)
-    return len(parents) > 1 and parents[-2] == _eos_path
+    absolute = _non_strict_resolve(Path(*args).expanduser().absolute().parent, _as_posix=True)
+    # The path is resolved, so a plain string comparison of the first component suffices
+    return absolute == _eos_prefix or absolute.startswith(f"{_eos_prefix}/")
 
 def _parse_instance(eos_instance):
     if eos_instance == 'home':
@@ -163,8 +163,6 @@ class EosPath(FsPath, Path):
     # ======================
 
     def exists(self, *args, **kwargs):
-        if self.is_symlink():
-            return self.resolve().exists(*args, **kwargs)
         return _eos_exists(self.expanduser(), *args, **kwargs)
 
     def stat(self, *args, **kwargs):
@@ -176,13 +174,9 @@ class EosPath(FsPath, Path):
         return _eos_lstat(self.expanduser(), *args, **kwargs)
 
     def is_file(self, *args, **kwargs):
-        if self.is_symlink():
-            return self.resolve().is_file(*args, **kwargs)
         return _eos_is_file(self.expanduser(), *args, **kwargs)
 
     def is_dir(self, *args, **kwargs):
-        if self.is_symlink():
-            return self.resolve().is_dir(*args, **kwargs)
         return _eos_is_dir(self.expanduser(), *args, **kwargs)
 
     def is_symlink(self, *args, **kwargs):
@@ -191,8 +185,8 @@ class EosPath(FsPath, Path):
     def touch(self, *args, **kwargs):
         return _eos_touch(self.expanduser(), *args, **kwargs)
 
-    def unlink(self, *args, **kwargs):
-        return _eos_unlink(self.expanduser(), *args, **kwargs)
+    def unlink(self, missing_ok=False, **kwargs):
+        return _eos_unlink(self.expanduser(), missing_ok=missing_ok, **kwargs)
 
     def mkdir(self, *args, **kwargs):
         return _eos_mkdir(self.expanduser(), *args, **kwargs)
@@ -214,6 +208,9 @@ class EosPath(FsPath, Path):
         target = FsPath(target)
         return _eos_symlink_to(self.expanduser(), FsPath, target.expanduser(), target_is_directory=target_is_directory, **kwargs)
 
+    def lexists(self, *args, **kwargs):
+        return _eos_lexists(self.expanduser(), *args, **kwargs)
+
     def rmtree(self, *args, **kwargs):
         return _eos_rmtree(self.expanduser(), FsPath, *args, **kwargs)
 
@@ -5,6 +5,8 @@
 
 import os
 import stat
+from contextlib import contextmanager
+from contextvars import ContextVar
 from subprocess import run, PIPE, CalledProcessError
 from pathlib import Path
 import warnings
@@ -18,7 +20,6 @@ _eos_path = Path('/eos')
 
 _eos_version = -1
 _eos_version_int = -1
-_eos_arg_for_find = 'find'
 _eoscmd_installed = False
 if os.name != 'nt':
     try:
@@ -34,15 +35,6 @@ if os.name != 'nt':
             _eos_version_int = _eos_version.split('.')
             _eos_version_int = int(1.e6*int(_eos_version_int[0]) + 1.e3*int(_eos_version_int[1]) \
                                 + int(_eos_version_int[2]))
-            # The command `eos find` has the wrong behaviour on new machines (running eos 5.2).
-            # For this reason, the command `eos oldfind` has been introduced.
-            # However, this command does not exist on the old machines, so in that case we
-            # default back to `eos find`. This function gives the correct argument for eos find.
-            eos_env = {**os.environ, 'EOS_MGM_URL':  f'root://eos{default_eos_instance}.{EOS_CELL}'}
-            cmd = run(['eos', 'oldfind'], stdout=PIPE, stderr=PIPE, env=eos_env)
-            if cmd.returncode != 255:
-                # Command found; we are running on a machine running new eos >= 5.2
-                _eos_arg_for_find = 'oldfind'
     except (CalledProcessError, FileNotFoundError):
         _eoscmd_installed = False
 
@@ -106,21 +98,101 @@ def is_egroup_member(egroup, verbose=False):
     return is_member
 
 
+# Directory snapshots
+# ===================
+
+# Listing of one directory, as (mgm, eos_path, {name: (ftype, size)}), consulted before each
+# `eos stat`. It is dropped on any modification made through the EOS methods below and through
+# cp/mv, but NOT on writes via the inherited Path methods, the FUSE mount or other processes.
+# Hence it is private, and only to be used around read-only sequences of type queries.
+_dir_snapshot = ContextVar('_dir_snapshot', default=None)
+_ls_types = {'-': stat.S_IFREG, 'd': stat.S_IFDIR, 'l': stat.S_IFLNK}
+
+@contextmanager
+def _eos_dir_snapshot(directory):
+    """Answer the type queries (exists, is_file, is_dir, is_symlink, ...) on the
+    entries of an EOS directory from a single `eos ls -l`, taken when entering
+    the context. This avoids a round-trip to EOS for every query. The snapshot is
+    discarded as soon as a file is modified through the EOS methods or cp/mv (also for
+    all enclosing contexts). Changes made in any other way are not seen.
+    """
+    from xaux.fs import FsPath, EosPath
+    directory = FsPath(directory)
+    snapshot = None
+    if isinstance(directory, EosPath):
+        success, result = _run_eos(['eos', 'ls', '-l', directory.eos_path], mgm=directory.mgm)
+        if success:
+            snapshot = {}
+            for line in result.splitlines():
+                # mode, links, user, group, size, month, day, time, name [-> target]
+                parts = line.split(maxsplit=8)
+                if len(parts) < 9 or parts[0][0] not in _ls_types:
+                    continue
+                ftype = _ls_types[parts[0][0]]
+                name = parts[8].split(' -> ')[0] if ftype == stat.S_IFLNK else parts[8]
+                size = int(parts[4]) if ftype == stat.S_IFREG else None
+                snapshot[name] = (ftype, size)
+    current = (directory.mgm, directory.eos_path.rstrip('/'), snapshot) \
+              if snapshot is not None else None
+    token = _dir_snapshot.set(current)
+    try:
+        yield
+    finally:
+        # If the snapshot got dropped, any enclosing one is stale as well
+        if _dir_snapshot.get() is current:
+            _dir_snapshot.reset(token)
+        else:
+            _dir_snapshot.set(None)
+
+def _from_dir_snapshot(path):
+    snapshot = _dir_snapshot.get()
+    if snapshot is None:
+        return None
+    mgm, directory, entries = snapshot
+    parent, name = os.path.split(path.eos_path.rstrip('/'))
+    if path.mgm != mgm or parent != directory:
+        return None
+    if name not in entries:
+        raise FileNotFoundError
+    return entries[name]
+
+def _drop_dir_snapshot():
+    _dir_snapshot.set(None)
+
+
 # Overwrite Path methods
 # ======================
 
+# The checks below need only one `eos stat` call: symlinks are recognised from its
+# output and only then resolved, without a separate is_symlink call
+
 def _eos_exists(path, *args, **kwargs):
     _assert_eos_accessible("Cannot stat EOS paths.")
     try:
         ftype, _ = _get_type(path, *args, **kwargs)
     except FileNotFoundError:
         return False
+    if ftype == stat.S_IFLNK:
+        return path.resolve().exists(*args, **kwargs)
     if ftype is not None:
         return True
     return Path(path.eos_path).exists(*args, **kwargs)
 
+def _eos_lexists(path, *args, **kwargs):
+    _assert_eos_accessible("Cannot stat EOS paths.")
+    try:
+        ftype, _ = _get_type(path, *args, **kwargs)
+    except FileNotFoundError:
+        return False
+    if ftype is not None:
+        return True
+    return Path(path.eos_path).is_symlink() or Path(path.eos_path).exists()
+
 
 def _get_type(path, *args, **kwargs):
+    cached = _from_dir_snapshot(path)
+    if cached is not None:
+        return cached
     success, result = _run_eos(['eos', 'stat', path.eos_path], mgm=path.mgm,
                         _false_if_stderr_contains='failed to stat', **kwargs)
     if success:
@@ -144,6 +216,8 @@ def _eos_is_file(path, *args, **kwargs):
         ftype, _ = _get_type(path, *args, **kwargs)
     except FileNotFoundError:
         return False
+    if ftype == stat.S_IFLNK:
+        return path.resolve().is_file(*args, **kwargs)
     if ftype is not None:
         return ftype == stat.S_IFREG
     return Path.is_file(path, *args, **kwargs)
@@ -154,6 +228,8 @@ def _eos_is_dir(path, *args, **kwargs):
         ftype, _ = _get_type(path, *args, **kwargs)
     except FileNotFoundError:
         return False
+    if ftype == stat.S_IFLNK:
+        return path.resolve().is_dir(*args, **kwargs)
     if ftype is not None:
         return ftype == stat.S_IFDIR
     return Path.is_dir(path, *args, **kwargs)
@@ -255,29 +331,43 @@ def _eos_stat(path, *args, **kwargs):
 
 def _eos_touch(path, *args, **kwargs):
     _assert_eos_accessible("Cannot touch EOS paths.")
+    _drop_dir_snapshot()
     success, result = _run_eos(['eos', 'touch', path.eos_path], mgm=path.mgm, **kwargs)
     if success:
         return result
     return Path.touch(path, *args, **kwargs)
 
-def _eos_unlink(path, *args, **kwargs):
+def _eos_unlink(path, missing_ok=False, **kwargs):
     _assert_eos_accessible("Cannot unlink EOS paths.")
+    _drop_dir_snapshot()
     if not path.is_symlink() and path.is_dir():
         raise IsADirectoryError(f"{path} is a directory.")
-    success, result = _run_eos(['eos', 'rm', path.eos_path], mgm=path.mgm, **kwargs)
+    success, result = _run_eos(['eos', 'rm', path.eos_path], mgm=path.mgm,
+                        _false_if_stderr_contains='No such file or directory', **kwargs)
     if success:
+        if result is False:
+            if missing_ok:
+                return
+            raise FileNotFoundError(f"{path} does not exist.")
         return result
-    return Path.unlink(path, *args, **kwargs)
+    return Path.unlink(path, missing_ok=missing_ok)
 
-def _eos_mkdir(path, *args, **kwargs):
+def _eos_mkdir(path, mode=0o777, parents=False, exist_ok=False, **kwargs):
     _assert_eos_accessible("Cannot rmdir EOS paths.")
-    success, result = _run_eos(['eos', 'mkdir', path.eos_path], mgm=path.mgm, **kwargs)
+    _drop_dir_snapshot()
+    cmds = ['eos', 'mkdir', '-p', path.eos_path] if parents else ['eos', 'mkdir', path.eos_path]
+    success, result = _run_eos(cmds, mgm=path.mgm, _false_if_stderr_contains='File exists', **kwargs)
     if success:
+        if result is False:
+            if exist_ok and path.is_dir():
+                return
+            raise FileExistsError(f"{path} already exists.")
         return result
-    return Path.mkdir(path, *args, **kwargs)
+    return Path.mkdir(path, mode=mode, parents=parents, exist_ok=exist_ok)
 
 def _eos_rmdir(path, *args, **kwargs):
     _assert_eos_accessible("Cannot rmdir EOS paths.")
+    _drop_dir_snapshot()
     if path.is_symlink() or not path.is_dir():
         raise NotADirectoryError(f"{path} is not a directory.")
     success, result = _run_eos(['eos', 'rmdir', path.eos_path], mgm=path.mgm, **kwargs)
@@ -291,6 +381,7 @@ def _eos_rmdir(path, *args, **kwargs):
 
 def _eos_symlink_to(path, def_cls, target, target_is_directory=False, **kwargs):
     _assert_eos_accessible("Cannot create symlinks on EOS paths.")
+    _drop_dir_snapshot()
     success, result = _run_eos(['eos', 'ln', '-fns', path.eos_path, target.as_posix()],
                                mgm=path.mgm, **kwargs)
     if success:
@@ -300,6 +391,7 @@ def _eos_symlink_to(path, def_cls, target, target_is_directory=False, **kwargs):
 
 def _eos_rmtree(path, def_cls, *args, **kwargs):
     _assert_eos_accessible("Cannot rmtree EOS paths.")
+    _drop_dir_snapshot()
     if not path.is_dir():
         raise NotADirectoryError(f"{path} is not a directory.")
     success, result = _run_eos(['eos', 'rm', '-r', path.eos_path], mgm=path.mgm, **kwargs)
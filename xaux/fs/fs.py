@@ -63,6 +63,9 @@ class FsPath:
     # PurePath methods
     # ================
 
+    # Note that _in_constructor temporarily patches class attributes, hence FsPath
+    # instantiation (and every method that instantiates a path) is not thread-safe.
+    # Path operations cannot be parallelised with threads; use processes instead.
     if sys.version_info >= (3, 12):
         def with_segments(self, *pathsegments, _cast_as_fspath=True, _force_path=False):
             if _cast_as_fspath:
@@ -167,10 +170,18 @@ class FsPath:
         return Path.symlink_to(self.expanduser().resolve(**kwargs), target.expanduser(),
                                target_is_directory=target.is_dir(**kwargs), **kwargs)
 
-    def unlink(self, *args, **kwargs):
-        if not self.is_symlink(*args, **kwargs) and self.is_dir(*args, **kwargs):
-            raise IsADirectoryError(f"{self} is a directory.")
-        Path.unlink(self.expanduser(), *args, **kwargs)
+    def unlink(self, missing_ok=False):
+        # Only probe the path when the unlink fails, to avoid the extra stats
+        try:
+            Path.unlink(self.expanduser())
+        except FileNotFoundError:
+            if not missing_ok:
+                raise
+        except (IsADirectoryError, PermissionError):
+            # Depending on the OS, unlinking a directory gives either of these
+            if not self.is_symlink() and self.is_dir():
+                raise IsADirectoryError(f"{self} is a directory.")
+            raise
 
     def rmdir(self, *args, **kwargs):
         if not self.is_dir(*args, **kwargs):
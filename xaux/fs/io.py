@@ -11,13 +11,14 @@ import warnings
 from .fs import FsPath
 from .afs import AfsPath, _afs_mounted
 from .eos import EosPath
-from .eos_methods import _eos_mounted, _xrdcp_installed, _eoscmd_installed, _eos_version, _eos_version_int
+from .eos_methods import _eos_mounted, _xrdcp_installed, _eoscmd_installed, _eos_version, _eos_version_int, \
+                         _drop_dir_snapshot
 
 
 # TODO:
-#   - xrdcp: increase efficiency by using a list of files
+#   - xrdcp: files into the same directory are batched with --parallel, but renamed files
+#            still need one call each; pass the batches as a list of files (--infiles)
 #   - xrdcp: check if recursive still needs to be done manually
-#   - xrdcp: can we parallelize?
 #   - xrdcp and eos: implement follow_symlinks
 #   - test if symlinks behave correctly
 #   - EOS is very very slow
@@ -45,6 +46,8 @@ def cp(*args, recursive=False, follow_symlinks=True, **kwargs):
     # print("COPY"); import time; t_start = time.time(); t_prev = t_start
     if len(args) < 2:
         return
+    # Copies (and hence moves) can modify EOS directories, so an active snapshot is stale
+    _drop_dir_snapshot()
     this_stdout = ""
     this_stderr = ""
     args = [FsPath(arg).expanduser() for arg in args]
@@ -298,7 +301,8 @@ def _cp_xrdcp(sources_targets):
     else:
         env = {}
 
-    # TODO: increase efficiency by using a list of files
+    # TODO: pass the batched sources as a list of files (--infiles) instead of on the
+    #       command line, to avoid overly long commands for large batches
     # path_src = [src.eos_path_full if isinstance(src, EosPath) else src.as_posix() for src in sources]
     # infiles = path_src
     # if len(path_src) > 1:
@@ -309,14 +313,14 @@ def _cp_xrdcp(sources_targets):
     #             fid.write(arg + '\n')
     #     infiles = ['--infiles', _temp.as_posix()]
 
-    cmd_data = []
+    copies = []
     for src, target, recursive in sources_targets:
         if recursive:
             if not isinstance(target, EosPath) and not isinstance(target, AfsPath):
                 # Not an XRootD path so -r works
                 path_src = src.eos_path_full if isinstance(src, EosPath) else src.as_posix()
                 path_target = target.eos_path_full if isinstance(target, EosPath) else target.as_posix()
-                cmd_data.append(['xrdcp', '-r', *opts, path_src, path_target, src, target, True])
+                copies.append([path_src, path_target, src, target, True, False])
             else:
                 # Manually walk through the directory
                 for new_src in src.rglob('*'):
@@ -326,26 +330,60 @@ def _cp_xrdcp(sources_targets):
                     path_src = new_src.eos_path_full if isinstance(new_src, EosPath) else new_src.as_posix()
                     new_target = target / new_src.relative_to(src)
                     path_target = new_target.eos_path_full if isinstance(new_target, EosPath) else new_target.as_posix()
-                    cmd_data.append(['xrdcp', *opts, path_src, path_target, new_src, new_target, False])
+                    copies.append([path_src, path_target, new_src, new_target, False, False])
 
         else:
             path_src = src.eos_path_full if isinstance(src, EosPath) else src.as_posix()
             path_target = target.eos_path_full if isinstance(target, EosPath) else target.as_posix()
-            cmd_data.append(['xrdcp', *opts, path_src, path_target, src, target, False])
+            # These can be batched if the file is not renamed, as xrdcp keeps the source
+            # name when copying several files into a directory. The target directory
+            # exists, as this is verified in _loop_sources_and_verify for regular files.
+            copies.append([path_src, path_target, src, target, False, src.name == target.name])
+
+    # Each xrdcp call has a considerable overhead, so files that are copied into the
+    # same directory are transferred together with --parallel. A batch is executed at
+    # the position of its first file. As the files within a batch are copied in any
+    # order, a batch is closed (and a new one started) when a target name repeats in it,
+    # or when a non-batched copy touches its directory, such that the last copy wins.
+    groups = []
+    batches = {}
+    for path_src, path_target, src, target, recursive, batchable in copies:
+        if batchable:
+            target_dir = path_target[:-len(target.name)]
+            batch = batches.get(target_dir)
+            if batch is None or any(f[3].name == target.name for f in batch):
+                batch = batches[target_dir] = []
+                groups.append(batch)
+            batch.append([path_src, path_target, src, target, recursive])
+        else:
+            path_overlap = path_target.rstrip('/') + '/'
+            for target_dir in [d for d in batches
+                               if d.startswith(path_overlap) or path_overlap.startswith(d)]:
+                del batches[target_dir]
+            groups.append([[path_src, path_target, src, target, recursive]])
+    cmd_data = []
+    for group in groups:
+        if len(group) == 1:
+            path_src, path_target, src, target, recursive = group[0]
+            rec = ['-r'] if recursive else []
+            cmd_data.append([['xrdcp', *rec, *opts, path_src, path_target], [[src, target, recursive]]])
+        else:
+            target_dir = group[0][1][:-len(group[0][3].name)]
+            parallel = ['--parallel', f'{min(len(group), 4)}']
+            cmd_data.append([['xrdcp', *parallel, *opts, *[f[0] for f in group], target_dir],
+                             [[f[2], f[3], False] for f in group]])
 
-    for this_cmd_data in cmd_data:
-        src = this_cmd_data[-3]
-        target = this_cmd_data[-2]
-        this_cmd = this_cmd_data[:-3]
+    for this_cmd, this_sources_targets in cmd_data:
         cmd_mess = ' '.join(this_cmd)
         try:
             this_stderr = ""
             cmd = run(this_cmd, stdout=PIPE, stderr=PIPE, **env)
             if cmd.returncode == 0:
                 # Verify the files exist
-                if not target.exists():
-                    this_stderr += f"Failed {cmd_mess}:\n"
-                    this_stderr += f"   Target {target} does not exist.\n"
+                for _, target, _ in this_sources_targets:
+                    if not target.exists():
+                        this_stderr += f"Failed {cmd_mess}:\n"
+                        this_stderr += f"   Target {target} does not exist.\n"
             else:
                 this_stderr += f"Failed {cmd_mess}:\n"
                 this_stderr += f"   {cmd.stderr.decode('UTF-8').strip()}\n"
@@ -363,7 +401,8 @@ def _cp_xrdcp(sources_targets):
         #     if infiles[0] == '--infiles':
         #         _temp.unlink()
 
-    sources_targets = [f[-3:] for f in cmd_data if not f[-2].exists()]
+    sources_targets = [f for _, this_sources_targets in cmd_data
+                         for f in this_sources_targets if not f[1].exists()]
 
     return sources_targets, stdout, stderr
 
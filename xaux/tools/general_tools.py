@@ -14,6 +14,10 @@ import numpy as np
 from ..fs import FsPath
 
 
+_b64_alphabet = np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_',
+                              dtype=np.uint8)
+
+
 def timestamp(*, in_filename=False, ms=False, us=False):
     """Timestamp for easy use in logs and filenames.
     Args:
@@ -48,22 +52,24 @@ def ranID(*, length=12, size=1, only_alphanumeric=False):
         raise ValueError("Length must be greater than 0!")
     if size < 1:
         raise ValueError("Size must be greater than 0!")
-    if size > 1:
-        return [ranID(length=length, only_alphanumeric=only_alphanumeric)
-                for _ in range(size)]
-    length = int(np.ceil(length/4))
+    n_chars = 4*int(np.ceil(length/4))
     if only_alphanumeric:
-        ran = ''
-        for _ in range(length):
-            while True:
-                this_ran = ranID(length=4, only_alphanumeric=False)
-                if this_ran.isalnum():
-                    break
-            ran += this_ran
-        return ran
+        # Uniform indices into the base64 alphabet (top 6 bits of each random byte),
+        # rejecting '-' and '_' (the last two), drawn for all IDs at once
+        chars = np.empty(0, dtype=np.uint8)
+        while chars.size < n_chars*size:
+            n_missing = n_chars*size - chars.size
+            idx = np.frombuffer(os.urandom(n_missing + n_missing//16 + 4), dtype=np.uint8) >> 2
+            chars = np.concatenate([chars, _b64_alphabet[idx[idx < 62]]])
+        ran = chars[:n_chars*size].tobytes().decode('utf-8')
     else:
-        random_bytes = os.urandom(3*length)
-        return base64.urlsafe_b64encode(random_bytes).decode('utf-8')
+        # Every 3 random bytes are encoded independently into 4 characters,
+        # so all IDs can be generated in one go and then split
+        random_bytes = os.urandom(3*n_chars//4*size)
+        ran = base64.urlsafe_b64encode(random_bytes).decode('utf-8')
+    if size == 1:
+        return ran
+    return [ran[i:i+n_chars] for i in range(0, n_chars*size, n_chars)]
 
 
 def system_lock(lockfile):